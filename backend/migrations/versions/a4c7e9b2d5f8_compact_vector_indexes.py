@@ -0,0 +1,59 @@
+"""replace the float32 hnsw index with halfvec and binary-quantized ones
+
+Revision ID: a4c7e9b2d5f8
+Revises: f3d8a2b6c4e1
+Create Date: 2026-02-12 10:14:52.308117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e9b2d5f8'
+down_revision: Union[str, Sequence[str], None] = 'f3d8a2b6c4e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Expression indexes: building them quantizes every existing row, so no
+    # separate backfill is needed and new rows are covered automatically.
+    op.create_index(
+        'ix_embeddings_halfvec_hnsw_paper_abstract',
+        'embeddings',
+        [sa.text('CAST(vector AS HALFVEC(1536)) halfvec_cosine_ops')],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_where=sa.text("kind = 'paper_abstract'"),
+    )
+    op.create_index(
+        'ix_embeddings_bit_hnsw_paper_abstract',
+        'embeddings',
+        [sa.text('CAST(binary_quantize(vector) AS BIT(1536)) bit_hamming_ops')],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_where=sa.text("kind = 'paper_abstract'"),
+    )
+    op.drop_index('ix_embeddings_vector_hnsw_paper_abstract', table_name='embeddings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_embeddings_vector_hnsw_paper_abstract',
+        'embeddings',
+        ['vector'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'vector': 'vector_cosine_ops'},
+        postgresql_where=sa.text("kind = 'paper_abstract'"),
+    )
+    op.drop_index('ix_embeddings_bit_hnsw_paper_abstract', table_name='embeddings')
+    op.drop_index('ix_embeddings_halfvec_hnsw_paper_abstract', table_name='embeddings')
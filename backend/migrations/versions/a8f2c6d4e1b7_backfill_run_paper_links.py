@@ -0,0 +1,38 @@
+"""link papers to runs that only recorded them through extractions
+
+Revision ID: a8f2c6d4e1b7
+Revises: f1b6e3a9c7d2
+Create Date: 2026-03-02 09:41:13.682045
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8f2c6d4e1b7'
+down_revision: Union[str, Sequence[str], None] = 'f1b6e3a9c7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # run_papers is now the only record of a run's papers. Runs from before
+    # papers were linked have no links at all; give them one per extracted
+    # paper. Runs that already have links are left alone, so papers that
+    # dedup unlinked do not come back.
+    op.execute("""
+        INSERT INTO run_papers (run_id, paper_id)
+        SELECT DISTINCT e.run_id, e.paper_id
+        FROM extractions e
+        WHERE NOT EXISTS (SELECT 1 FROM run_papers rp WHERE rp.run_id = e.run_id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the backfilled links cannot be told apart from regular ones; keep them
+    pass
@@ -0,0 +1,40 @@
+"""add run queue columns
+
+Revision ID: b1c4e2a7d901
+Revises: add_upload_papers
+Create Date: 2026-01-20 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1c4e2a7d901'
+down_revision: Union[str, Sequence[str], None] = 'add_upload_papers'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('runs', sa.Column('worker_id', sa.String(length=200), nullable=True))
+    op.add_column('runs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('runs', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('runs', sa.Column('started_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('runs', sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Workers poll by status; keep that lookup off a sequential scan
+    op.create_index(op.f('ix_runs_status'), 'runs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_runs_status'), table_name='runs')
+    op.drop_column('runs', 'finished_at')
+    op.drop_column('runs', 'started_at')
+    op.drop_column('runs', 'attempts')
+    op.drop_column('runs', 'heartbeat_at')
+    op.drop_column('runs', 'worker_id')
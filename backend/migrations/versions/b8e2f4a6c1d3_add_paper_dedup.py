@@ -0,0 +1,56 @@
+"""add papers.doi_normalized and paper_aliases
+
+Revision ID: b8e2f4a6c1d3
+Revises: a4c7e9b2d5f8
+Create Date: 2026-02-14 09:47:03.915826
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f4a6c1d3'
+down_revision: Union[str, Sequence[str], None] = 'a4c7e9b2d5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('papers', sa.Column('doi_normalized', sa.String(length=200), nullable=True))
+    # same rule as utils.doi.normalize_doi
+    op.execute(r"""
+        UPDATE papers
+        SET doi_normalized = nullif(lower(btrim(regexp_replace(
+            btrim(doi), '^(https?://(dx\.)?doi\.org/|doi:\s*)', '', 'i'
+        ))), '')
+        WHERE doi IS NOT NULL
+    """)
+    op.create_index(op.f('ix_papers_doi_normalized'), 'papers', ['doi_normalized'], unique=False)
+
+    op.create_table('paper_aliases',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('paper_id', sa.Integer(), nullable=False),
+    sa.Column('canonical_paper_id', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=20), nullable=False),
+    sa.Column('similarity', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['canonical_paper_id'], ['papers.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('paper_id')
+    )
+    op.create_index(op.f('ix_paper_aliases_canonical_paper_id'), 'paper_aliases', ['canonical_paper_id'], unique=False)
+    op.create_index(op.f('ix_paper_aliases_id'), 'paper_aliases', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_paper_aliases_id'), table_name='paper_aliases')
+    op.drop_index(op.f('ix_paper_aliases_canonical_paper_id'), table_name='paper_aliases')
+    op.drop_table('paper_aliases')
+    op.drop_index(op.f('ix_papers_doi_normalized'), table_name='papers')
+    op.drop_column('papers', 'doi_normalized')
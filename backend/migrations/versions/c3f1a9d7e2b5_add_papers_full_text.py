@@ -0,0 +1,28 @@
+"""add papers.full_text for uploaded pdfs
+
+Revision ID: c3f1a9d7e2b5
+Revises: b8e2f4a6c1d3
+Create Date: 2026-02-16 14:22:41.603378
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a9d7e2b5'
+down_revision: Union[str, Sequence[str], None] = 'b8e2f4a6c1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('papers', sa.Column('full_text', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('papers', 'full_text')
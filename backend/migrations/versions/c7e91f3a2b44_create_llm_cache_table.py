@@ -0,0 +1,41 @@
+"""create llm_cache table
+
+Revision ID: c7e91f3a2b44
+Revises: b1c4e2a7d901
+Create Date: 2026-01-23 15:47:02.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e91f3a2b44'
+down_revision: Union[str, Sequence[str], None] = 'b1c4e2a7d901'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('response', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_hit_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_llm_cache_id'), 'llm_cache', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_llm_cache_id'), table_name='llm_cache')
+    op.drop_table('llm_cache')
@@ -0,0 +1,61 @@
+"""bound retrieval_cache: unique key, in-place refresh, lru bookkeeping
+
+Revision ID: d2a6f8c1e5b3
+Revises: c7e91f3a2b44
+Create Date: 2026-01-27 09:21:55.610482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f8c1e5b3'
+down_revision: Union[str, Sequence[str], None] = 'c7e91f3a2b44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('retrieval_cache', 'topic', type_=sa.String(length=500), existing_nullable=False)
+    op.add_column('retrieval_cache', sa.Column('normalized_topic', sa.String(length=500), nullable=True))
+    op.add_column('retrieval_cache', sa.Column('query_params', sa.String(length=500), nullable=False, server_default=''))
+    op.add_column('retrieval_cache', sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('retrieval_cache', sa.Column('last_hit_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Same normalization as retrieval_cache_service.normalize_topic
+    op.execute(
+        "UPDATE retrieval_cache "
+        "SET normalized_topic = lower(regexp_replace(btrim(topic), '\\s+', ' ', 'g'))"
+    )
+    # Keep only the newest row per key before adding the unique constraint
+    op.execute(
+        "DELETE FROM retrieval_cache a USING retrieval_cache b "
+        "WHERE a.normalized_topic = b.normalized_topic "
+        "AND a.source = b.source AND a.query_params = b.query_params "
+        "AND a.id < b.id"
+    )
+    op.alter_column('retrieval_cache', 'normalized_topic', nullable=False)
+
+    op.drop_index('ix_retrieval_cache_topic_source', table_name='retrieval_cache')
+    op.drop_index('ix_retrieval_cache_topic', table_name='retrieval_cache')
+    op.create_unique_constraint(
+        'uq_retrieval_cache_key', 'retrieval_cache', ['normalized_topic', 'source', 'query_params']
+    )
+    op.create_index('ix_retrieval_cache_last_hit_at', 'retrieval_cache', ['last_hit_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_retrieval_cache_last_hit_at', table_name='retrieval_cache')
+    op.drop_constraint('uq_retrieval_cache_key', 'retrieval_cache', type_='unique')
+    op.create_index('ix_retrieval_cache_topic', 'retrieval_cache', ['topic'])
+    op.create_index('ix_retrieval_cache_topic_source', 'retrieval_cache', ['topic', 'source'])
+    op.drop_column('retrieval_cache', 'last_hit_at')
+    op.drop_column('retrieval_cache', 'hit_count')
+    op.drop_column('retrieval_cache', 'query_params')
+    op.drop_column('retrieval_cache', 'normalized_topic')
+    op.alter_column('retrieval_cache', 'topic', type_=sa.String(length=255), existing_nullable=False)
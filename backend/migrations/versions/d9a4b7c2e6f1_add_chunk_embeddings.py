@@ -0,0 +1,40 @@
+"""add chunk columns and hnsw index for kind='chunk' embeddings
+
+Revision ID: d9a4b7c2e6f1
+Revises: c3f1a9d7e2b5
+Create Date: 2026-02-18 11:36:09.284517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a4b7c2e6f1'
+down_revision: Union[str, Sequence[str], None] = 'c3f1a9d7e2b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('embeddings', sa.Column('content', sa.Text(), nullable=True))
+    op.add_column('embeddings', sa.Column('chunk_index', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_embeddings_halfvec_hnsw_chunk',
+        'embeddings',
+        [sa.text('CAST(vector AS HALFVEC(1536)) halfvec_cosine_ops')],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_where=sa.text("kind = 'chunk'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embeddings_halfvec_hnsw_chunk', table_name='embeddings')
+    op.drop_column('embeddings', 'chunk_index')
+    op.drop_column('embeddings', 'content')
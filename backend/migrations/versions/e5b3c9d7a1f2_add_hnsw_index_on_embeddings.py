@@ -0,0 +1,37 @@
+"""add hnsw index on embeddings.vector for paper abstracts
+
+Revision ID: e5b3c9d7a1f2
+Revises: d2a6f8c1e5b3
+Create Date: 2026-02-03 11:05:37.122946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b3c9d7a1f2'
+down_revision: Union[str, Sequence[str], None] = 'd2a6f8c1e5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_embeddings_vector_hnsw_paper_abstract',
+        'embeddings',
+        ['vector'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'vector': 'vector_cosine_ops'},
+        postgresql_where=sa.text("kind = 'paper_abstract'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embeddings_vector_hnsw_paper_abstract', table_name='embeddings')
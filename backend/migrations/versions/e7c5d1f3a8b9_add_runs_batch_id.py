@@ -0,0 +1,30 @@
+"""add runs.batch_id
+
+Revision ID: e7c5d1f3a8b9
+Revises: d9a4b7c2e6f1
+Create Date: 2026-02-20 15:08:27.551290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c5d1f3a8b9'
+down_revision: Union[str, Sequence[str], None] = 'd9a4b7c2e6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('runs', sa.Column('batch_id', sa.String(length=36), nullable=True))
+    op.create_index(op.f('ix_runs_batch_id'), 'runs', ['batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_runs_batch_id'), table_name='runs')
+    op.drop_column('runs', 'batch_id')
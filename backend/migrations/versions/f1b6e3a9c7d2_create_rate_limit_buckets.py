@@ -0,0 +1,35 @@
+"""create rate_limit_buckets for the shared openai governor
+
+Revision ID: f1b6e3a9c7d2
+Revises: e7c5d1f3a8b9
+Create Date: 2026-02-23 10:41:56.730184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6e3a9c7d2'
+down_revision: Union[str, Sequence[str], None] = 'e7c5d1f3a8b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rate_limit_buckets',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('capacity', sa.Float(), nullable=False),
+    sa.Column('refill_per_second', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rate_limit_buckets')
@@ -0,0 +1,81 @@
+"""create embedding_cache keyed by model, dimensions and text hash
+
+Revision ID: f3d8a2b6c4e1
+Revises: e5b3c9d7a1f2
+Create Date: 2026-02-10 16:32:18.470513
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3d8a2b6c4e1'
+down_revision: Union[str, Sequence[str], None] = 'e5b3c9d7a1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Model the existing vectors were produced with (the historical default)
+LEGACY_EMBED_MODEL = 'text-embedding-3-small'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embedding_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('dimensions', sa.Integer(), nullable=False),
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('vector', pgvector.sqlalchemy.vector.VECTOR(dim=1536), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('model', 'dimensions', 'text_hash', name='uq_embedding_cache_key')
+    )
+    op.create_index(op.f('ix_embedding_cache_id'), 'embedding_cache', ['id'], unique=False)
+
+    op.add_column('embeddings', sa.Column('model', sa.String(length=100), nullable=True))
+    op.add_column('embeddings', sa.Column('cache_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_embeddings_cache_id', 'embeddings', 'embedding_cache', ['cache_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_embeddings_cache_id'), 'embeddings', ['cache_id'], unique=False)
+
+    # Backfill: existing paper vectors were embedded from abstract-or-title.
+    # Normalization matches embedding_service.normalize_embedding_text.
+    op.execute(f"UPDATE embeddings SET model = '{LEGACY_EMBED_MODEL}' WHERE model IS NULL")
+    op.execute(f"""
+        INSERT INTO embedding_cache (model, dimensions, text_hash, vector)
+        SELECT DISTINCT ON (h.text_hash) '{LEGACY_EMBED_MODEL}', 1536, h.text_hash, h.vector
+        FROM (
+            SELECT e.id, e.vector,
+                   encode(sha256(convert_to(btrim(regexp_replace(
+                       coalesce(nullif(btrim(p.abstract), ''), btrim(p.title)), '\\s+', ' ', 'g'
+                   )), 'UTF8')), 'hex') AS text_hash
+            FROM embeddings e JOIN papers p ON p.id = e.paper_id
+            WHERE e.kind = 'paper_abstract'
+        ) h
+        ORDER BY h.text_hash, h.id
+        ON CONFLICT ON CONSTRAINT uq_embedding_cache_key DO NOTHING
+    """)
+    op.execute(f"""
+        UPDATE embeddings e SET cache_id = c.id
+        FROM papers p, embedding_cache c
+        WHERE p.id = e.paper_id
+          AND e.kind = 'paper_abstract'
+          AND c.model = '{LEGACY_EMBED_MODEL}' AND c.dimensions = 1536
+          AND c.text_hash = encode(sha256(convert_to(btrim(regexp_replace(
+                coalesce(nullif(btrim(p.abstract), ''), btrim(p.title)), '\\s+', ' ', 'g'
+              )), 'UTF8')), 'hex')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_embeddings_cache_id'), table_name='embeddings')
+    op.drop_constraint('fk_embeddings_cache_id', 'embeddings', type_='foreignkey')
+    op.drop_column('embeddings', 'cache_id')
+    op.drop_column('embeddings', 'model')
+    op.drop_index(op.f('ix_embedding_cache_id'), table_name='embedding_cache')
+    op.drop_table('embedding_cache')
@@ -0,0 +1,19 @@
+from langchain_core.runnables import RunnableConfig
+
+from src.app.graph.state import AgentState, graph_db
+from src.app.services.dedup_service import collapse_duplicates
+from src.app.services.run_events_service import publish_run_event
+
+
+def dedup_agent(state: AgentState, config: RunnableConfig) -> AgentState:
+    """Collapse near-duplicate papers before anything is extracted or embedded twice."""
+    db = graph_db(config)
+    run_id = state["run_id"]
+    papers = state.get("papers", [])
+
+    canonical = collapse_duplicates(db, run_id, papers)
+    if len(canonical) != len(papers):
+        publish_run_event(run_id, "papers_deduplicated", before=len(papers), after=len(canonical))
+
+    state["papers"] = canonical
+    return state
@@ -1,38 +1,86 @@
-from src.app.graph.state import AgentState
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.runnables import RunnableConfig
+
+from src.app.core.metrics import count_cache
+from src.app.core.settings import settings
+from src.app.graph.state import AgentState, graph_db
 from src.app.tools.openai_client import extract_paper_fields
-from src.app.services.extraction_service import save_extraction, get_latest_extraction_for_paper
-from src.app.services.embedding_service import get_or_create_paper_embedding
+from src.app.services.extraction_service import save_extraction
+from src.app.services.chunk_service import chunk_and_embed_papers
+from src.app.services.embedding_service import get_or_create_paper_embeddings
+from src.app.services.paper_cache_service import prefetch_paper_cache
+from src.app.services.run_events_service import publish_run_event
 
 
-def extractor_agent(state: AgentState) -> AgentState:
-    db = state["db"]
+def extractor_agent(state: AgentState, config: RunnableConfig) -> AgentState:
+    db = graph_db(config)
     run_id = state["run_id"]
     papers = state.get("papers", [])
 
-    extractions = []
+    # 1. load cached extractions/embeddings for the whole paper set at once,
+    #    then figure out what each paper still needs
+    cache = prefetch_paper_cache(db, [p.get("id") for p in papers])
 
+    jobs = []
     for p in papers:
         paper_id = p.get("id")
         title = p.get("title") or ""
         abstract = p.get("abstract") or ""
 
-        text_to_embed = abstract.strip() or title.strip()
-        if text_to_embed:
-            get_or_create_paper_embedding(db, paper_id=paper_id, text=text_to_embed)
-
-        cached = get_latest_extraction_for_paper(db, paper_id=paper_id)
-
-        if cached:
-            extracted = cached.data
-        else:
-            extracted = extract_paper_fields(title=title, abstract=abstract)
-            save_extraction(db, run_id=run_id, paper_id=paper_id, data=extracted)
-
-        extractions.append({
+        jobs.append({
             "paper_id": paper_id,
             "title": title,
-            "extracted": extracted,
+            "abstract": abstract,
+            "text_to_embed": abstract.strip() or title.strip(),
+            "cached": cache.extraction_data(paper_id),
         })
 
+    cached_count = sum(1 for job in jobs if job["cached"] is not None)
+    count_cache("extraction", hits=cached_count, misses=len(jobs) - cached_count)
+
+    # 2. fan the extraction calls out over a bounded pool; pool threads only
+    #    talk to OpenAI, never to the DB session
+    extractions = []
+    with ThreadPoolExecutor(max_workers=max(1, settings.EXTRACTION_CONCURRENCY)) as pool:
+        futures = [
+            # copy_context keeps the caller's OpenAI lane in the pool thread
+            pool.submit(contextvars.copy_context().run, extract_paper_fields, title=job["title"], abstract=job["abstract"])
+            if job["cached"] is None else None
+            for job in jobs
+        ]
+
+        # 3. while those are in flight, embed every paper that still lacks a
+        #    vector in one batched request
+        get_or_create_paper_embeddings(
+            db,
+            paper_ids=[job["paper_id"] for job in jobs],
+            texts=[job["text_to_embed"] for job in jobs],
+            existing=cache.embeddings,
+        )
+        # papers with full text (uploaded PDFs) also get passage-level chunks
+        chunk_and_embed_papers(db, [job["paper_id"] for job in jobs])
+
+        # 4. write results back from this thread, in input order
+        for i, (job, fut) in enumerate(zip(jobs, futures), start=1):
+            if fut is None:
+                extracted = job["cached"]
+            else:
+                extracted = fut.result()
+                save_extraction(db, run_id=run_id, paper_id=job["paper_id"], data=extracted)
+
+            publish_run_event(
+                run_id, "paper_extracted",
+                paper_id=job["paper_id"], title=job["title"][:200],
+                cached=fut is None, done=i, total=len(jobs),
+            )
+
+            extractions.append({
+                "paper_id": job["paper_id"],
+                "title": job["title"],
+                "extracted": extracted,
+            })
+
     state["extractions"] = extractions
     return state
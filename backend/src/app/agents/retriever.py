@@ -1,31 +1,31 @@
-from src.app.graph.state import AgentState
-from src.app.services.retrieval_service import retrieve_papers_for_topic
-from src.app.services.paper_service import upsert_paper
+from langchain_core.runnables import RunnableConfig
 
+from src.app.core.settings import settings
+from src.app.graph.state import AgentState, graph_db
+from src.app.services.retrieval_service import iter_paper_pages
+from src.app.services.paper_service import upsert_papers, link_papers_to_run
 
-def retriever_agent(state: AgentState) -> AgentState:
+
+def retriever_agent(state: AgentState, config: RunnableConfig) -> AgentState:
     topic = state["topic"]
-    db = state["db"]
+    db = graph_db(config)
     
     # If papers are already in state (from upload), skip retrieval
     if state.get("papers"):
         return state
 
-    papers = retrieve_papers_for_topic(db, topic, max_results=10)
-
     saved = []
-    for p in papers:
-        row = upsert_paper(db, p)
-        saved.append({
-            "id": row.id,
-            "source": row.source,
-            "source_id": row.source_id,
-            "title": row.title,
-            "year": row.year,
-            "doi": row.doi,
-            "abstract": row.abstract,
-            "url": row.url,
-        })
+    seen_ids = set()
+
+    # upsert and link each page as it arrives, one commit per page (the
+    # retrieval cache shares the session and commits between pages anyway)
+    for page in iter_paper_pages(db, topic, max_results=settings.RETRIEVAL_MAX_RESULTS):
+        rows = upsert_papers(db, page, commit=False)
+        link_papers_to_run(db, state["run_id"], [p["id"] for p in rows])
+        for p in rows:
+            if p["id"] not in seen_ids:
+                seen_ids.add(p["id"])
+                saved.append(p)
 
     state["papers"] = saved
     return state
@@ -1,25 +1,96 @@
-from src.app.graph.state import AgentState
-from src.app.services.run_knowledge_service import build_run_evidence
-from src.app.tools.openai_client import generate_review_outputs
+import json
+import time
+from typing import Any, Dict
 
+from langchain_core.runnables import RunnableConfig
 
-def synthesizer_agent(state: AgentState) -> AgentState:
-    db = state["db"]
+from src.app.core.settings import settings
+from src.app.graph.state import AgentState, graph_db
+from src.app.services.artifact_service import upsert_artifact
+from src.app.services.run_events_service import publish_run_event
+from src.app.services.run_knowledge_service import fill_token_budget, select_run_evidence, select_run_passages
+from src.app.services.synthesis_service import reduce_evidence, use_map_reduce
+from src.app.services.llm_cache_service import get_or_generate_review_outputs
+from src.app.tools.openai_client import estimate_tokens, stream_review_outputs
+from src.app.utils.partial_json import parse_partial_json
+
+
+def synthesizer_agent(state: AgentState, config: RunnableConfig) -> AgentState:
+    db = graph_db(config)
     run_id = state["run_id"]
     topic = state["topic"]
 
-    evidence = build_run_evidence(db, run_id=run_id, max_items=12)
-    outputs = generate_review_outputs(topic=topic, evidence=evidence)
+    # the full-text passages closest to the topic get their own slice of the
+    # budget, never more than half so the papers keep room of their own
+    passage_budget = min(settings.EVIDENCE_CHUNK_TOKEN_BUDGET, settings.EVIDENCE_TOKEN_BUDGET // 2)
+    passages = fill_token_budget(select_run_passages(db, run_id=run_id, topic=topic), passage_budget)
+    budget = settings.EVIDENCE_TOKEN_BUDGET - sum(estimate_tokens(p) for p in passages)
+
+    # every paper of the run, most relevant first
+    blocks = select_run_evidence(db, run_id=run_id, topic=topic)
+    if use_map_reduce(blocks, budget):
+        # large runs: summarize token-bounded batches (recursively) so no paper is dropped
+        evidence = reduce_evidence(db, topic, blocks, budget)
+    else:
+        evidence = "\n".join(fill_token_budget(blocks, budget))
+    if passages:
+        evidence = "\n".join(passages + [evidence])
+
+    def produce_streamed() -> Dict[str, Any]:
+        return _stream_outputs(db, run_id, topic, evidence)
+
+    produce = produce_streamed if settings.SYNTHESIS_STREAMING else None
+    outputs = get_or_generate_review_outputs(db, topic=topic, evidence=evidence, produce=produce)
+
+    state.update(format_review_outputs(outputs))
+    return state
+
+
+def _stream_outputs(db, run_id: int, topic: str, evidence: str) -> Dict[str, Any]:
+    """
+    Stream the review completion, periodically writing whatever is parseable
+    so far into the run's artifacts so readers see it before the model is done.
+    """
+    buffer = ""
+    last_flush = 0.0
+    written: Dict[str, str] = {}
+
+    for delta in stream_review_outputs(topic=topic, evidence=evidence):
+        buffer += delta
+        now = time.monotonic()
+        if now - last_flush < settings.SYNTHESIS_STREAM_FLUSH_SECONDS:
+            continue
+        last_flush = now
+
+        partial = parse_partial_json(buffer)
+        if partial:
+            _write_partials(db, run_id, partial, written)
+
+    return json.loads(buffer)
+
+
+def _write_partials(db, run_id: int, partial: Dict[str, Any], written: Dict[str, str]) -> None:
+    for kind, content in format_review_outputs(partial).items():
+        if kind not in partial or not content or written.get(kind) == content:
+            continue
+        upsert_artifact(db, run_id, kind, content)
+        written[kind] = content
+        publish_run_event(run_id, "artifact_partial", kind=kind, content=content)
+
+
+def format_review_outputs(outputs: Dict[str, Any]) -> Dict[str, str]:
+    """Turn the model's JSON into the text stored in state/artifacts."""
+    formatted_outputs: Dict[str, str] = {}
 
     # synthesis should be a string
-    state["synthesis"] = outputs.get("synthesis", "")
+    formatted_outputs["synthesis"] = outputs.get("synthesis", "")
 
     # gaps should be a list -> convert to readable bullets
     gaps = outputs.get("gaps", [])
     if isinstance(gaps, list):
-        state["gaps"] = "\n".join([f"- {g}" for g in gaps])
+        formatted_outputs["gaps"] = "\n".join([f"- {g}" for g in gaps])
     else:
-        state["gaps"] = str(gaps)
+        formatted_outputs["gaps"] = str(gaps)
 
     # hypotheses should be a list -> convert to readable paragraphs
     hyps = outputs.get("hypotheses", [])
@@ -42,17 +113,15 @@ def synthesizer_agent(state: AgentState) -> AgentState:
                     )
             else:
                 formatted.append(f"Hypothesis {i}: {str(h)}")
-        state["hypotheses"] = "\n\n".join(formatted)
+        formatted_outputs["hypotheses"] = "\n\n".join(formatted)
     else:
-        state["hypotheses"] = str(hyps)
+        formatted_outputs["hypotheses"] = str(hyps)
 
-    print("HYPOTHESES RAW:", outputs.get("hypotheses"))
-
-    return state
+    return formatted_outputs
 
 def _pick(d: dict, *keys: str) -> str:
     for k in keys:
         v = d.get(k)
         if isinstance(v, str) and v.strip():
             return v.strip()
-    return ""
\ No newline at end of file
+    return ""
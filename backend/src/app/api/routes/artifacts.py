@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.app.api.deps import get_db
-from src.app.db.models.artifact import Artifact
+from src.app.api.deps import get_async_db
+from src.app.services.artifact_service import list_artifacts_async
 
 router = APIRouter(prefix="/runs/{run_id}/artifacts", tags=["artifacts"])
 
 
 @router.get("")
-def list_artifacts(run_id: int, db: Session = Depends(get_db)):
-    items = db.query(Artifact).filter(Artifact.run_id == run_id).all()
+async def list_artifacts(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    items = await list_artifacts_async(db, run_id)
     return [
         {"id": a.id, "kind": a.kind, "content": a.content, "created_at": a.created_at}
         for a in items
@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy import text
-from sqlalchemy.orm import Session
-from src.app.api.deps import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.api.deps import get_async_db
 
 router = APIRouter()
 
 @router.get("/health")
-def health():
+async def health():
     return {"status": "okay"}
 
 @router.get("/health/db")
-def health_db(db: Session = Depends(get_db)):
-    db.execute(text("SELECT 1"))
+async def health_db(db: AsyncSession = Depends(get_async_db)):
+    await db.execute(text("SELECT 1"))
     return {"status": "ok", "db": "connected"}
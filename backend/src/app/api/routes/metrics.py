@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.api.deps import get_async_db
+from src.app.core.enums import RunStatus
+from src.app.core.metrics import RUNS_IN_FLIGHT, RUNS_QUEUED
+from src.app.services.run_service import count_runs_by_status_async
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(db: AsyncSession = Depends(get_async_db)):
+    # queue gauges come from the runs table so they cover every worker process
+    counts = await count_runs_by_status_async(db)
+    RUNS_QUEUED.set(counts.get(RunStatus.QUEUED.value, 0))
+    RUNS_IN_FLIGHT.set(counts.get(RunStatus.RUNNING.value, 0))
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
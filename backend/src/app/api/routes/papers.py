@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.api.deps import get_async_db
+from src.app.core.settings import settings
+from src.app.db.models.paper import Paper
+from src.app.services.similarity_service import (
+    find_similar_papers_async,
+    get_paper_vector_async,
+    measure_recall_async,
+)
+
+router = APIRouter(prefix="/papers", tags=["papers"])
+
+
+@router.get("/similar/recall")
+async def similarity_recall_endpoint(
+    k: int = Query(10, ge=1, le=100),
+    sample: int = Query(20, ge=1, le=200),
+    mode: Optional[str] = Query(None, pattern="^(halfvec|binary)$"),
+    ef_search: Optional[int] = Query(None, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """recall@k of the compact ANN index + re-rank versus an exact scan (needs VECTOR_RECALL_ENDPOINT=true)"""
+    if not settings.VECTOR_RECALL_ENDPOINT:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await measure_recall_async(db, k=k, sample_size=sample, mode=mode, ef_search=ef_search)
+
+
+@router.get("/{paper_id}/similar")
+async def similar_papers_endpoint(
+    paper_id: int,
+    k: int = Query(10, ge=1, le=100),
+    ef_search: Optional[int] = Query(None, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Nearest papers by abstract embedding (pgvector HNSW, cosine)"""
+    if not await db.get(Paper, paper_id):
+        raise HTTPException(status_code=404, detail="Paper not found")
+
+    vector = await get_paper_vector_async(db, paper_id)
+    if vector is None:
+        raise HTTPException(status_code=404, detail="Paper has no embedding yet")
+
+    return await find_similar_papers_async(
+        db, vector, k=k, ef_search=ef_search, exclude_paper_ids=[paper_id]
+    )
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import uuid
+import asyncio
+import json
 
-from src.app.api.deps import get_db
-from src.app.schemas.run import RunCreate, RunOut
-from src.app.services.run_service import create_run, list_runs
-from src.app.services.run_execution_service import execute_run
-from src.app.services.paper_service import upsert_paper, link_paper_to_run
+from src.app.api.deps import get_db, get_async_db
+from src.app.core.enums import RunStatus
+from src.app.core.settings import settings
+from src.app.db.session import AsyncSessionLocal
+from src.app.schemas.run import RunBatchCreate, RunBatchOut, RunCreate, RunOut
+from src.app.services.run_service import create_run, create_run_batch, list_runs_async, get_run_async
+from src.app.services.run_queue_service import enqueue_run, enqueue_runs, resume_run
+from src.app.services.paper_service import get_papers_by_source_ids, upsert_papers, link_papers_to_run
+from src.app.services.run_events_service import broadcaster
+from src.app.services.blob_store_service import store_upload
+from src.app.services.pdf_ingest_service import parse_pdf
 from src.app.db.models.run import Run
 
 router = APIRouter(prefix="/runs", tags=["runs"])
@@ -17,27 +27,102 @@ def create_run_endpoint(payload: RunCreate, db: Session = Depends(get_db)):
     return create_run(db, payload)
 
 
+@router.post("/batch", response_model=RunBatchOut)
+def create_run_batch_endpoint(payload: RunBatchCreate, db: Session = Depends(get_db)):
+    """
+    Create one run per topic and queue them together; a worker executes the
+    batch as a unit, extracting papers shared between topics only once
+    """
+    runs = enqueue_runs(db, create_run_batch(db, payload))
+    return {"batch_id": runs[0].batch_id, "runs": runs}
+
+
 @router.get("", response_model=list[RunOut])
-def list_runs_endpoint(db: Session = Depends(get_db)):
-    return list_runs(db)
+async def list_runs_endpoint(db: AsyncSession = Depends(get_async_db)):
+    return await list_runs_async(db)
 
 
 @router.get("/{run_id}", response_model=RunOut)
-def get_run_endpoint(run_id: int, db: Session = Depends(get_db)):
-    run = db.get(Run, run_id)
+async def get_run_endpoint(run_id: int, db: AsyncSession = Depends(get_async_db)):
+    run = await get_run_async(db, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     return run
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/{run_id}/events")
+async def run_events_endpoint(run_id: int, request: Request):
+    """Server-sent events with the run's progress until it completes or fails"""
+    terminal = {RunStatus.COMPLETED.value, RunStatus.FAILED.value}
+
+    async def read_status():
+        async with AsyncSessionLocal() as db:
+            run = await get_run_async(db, run_id)
+            return run.status if run else None
+
+    async def stream():
+        # subscribe (LISTEN active) before reading the snapshot so nothing falls in between
+        async with broadcaster.subscribe(run_id) as queue:
+            status = await read_status()
+            if status is None:
+                yield _sse("error", {"detail": "Run not found"})
+                return
+
+            yield _sse("run_status", {"run_id": run_id, "status": status})
+            if status in terminal:
+                return
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # the final event may have been missed while the listener reconnected
+                    status = await read_status()
+                    if status in terminal:
+                        yield _sse("run_status", {"run_id": run_id, "status": status})
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield _sse(event["event"], {"run_id": run_id, **event.get("data", {})})
+                if event["event"] == "run_status" and event.get("data", {}).get("status") in terminal:
+                    return
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _save_uploaded_papers(db: Session, run_id: int, paper_rows: list[dict], reused_ids: list[int]) -> list[dict]:
+    """Create new paper entries and link new and reused papers in one transaction"""
+    try:
+        papers = upsert_papers(db, paper_rows, commit=False)
+        link_papers_to_run(db, run_id, reused_ids + [p["id"] for p in papers], commit=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return papers
+
+
 @router.post("/{run_id}/upload-papers")
-def upload_papers_endpoint(
+async def upload_papers_endpoint(
     run_id: int,
     files: list[UploadFile] = File(...),
     db: Session = Depends(get_db)
 ):
-    """Upload PDF papers for a run"""
-    run = db.get(Run, run_id)
+    """
+    Upload PDF papers for a run. Files are stored by content hash, so a PDF
+    uploaded before resolves to its existing paper (and its cached
+    extraction/embedding) without being parsed again.
+    """
+    run = await run_in_threadpool(db.get, Run, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     
@@ -47,51 +132,80 @@ def upload_papers_endpoint(
             detail="This run is not configured for paper uploads"
         )
     
-    if len(files) > 20:
+    if len(files) > settings.MAX_UPLOAD_FILES:
         raise HTTPException(
             status_code=400,
-            detail="Maximum 20 papers allowed per run"
+            detail=f"Maximum {settings.MAX_UPLOAD_FILES} papers allowed per upload"
         )
-    
-    uploaded_papers = []
-    
+
+    for file in files:
+        if file.content_type != 'application/pdf':
+            raise HTTPException(
+                status_code=400,
+                detail=f"File {file.filename} is not a PDF"
+            )
+
+    # one file at a time, in bounded chunks; the hash becomes the paper's source_id
+    stored = []
+    for file in files:
+        sha256, path, _ = await store_upload(file)
+        stored.append((file, sha256, path))
+
+    existing = await run_in_threadpool(get_papers_by_source_ids, db, "uploaded", [sha for _, sha, _ in stored])
+
+    # parse each new blob once, even if it was sent twice in this request
+    to_parse = {}
+    for file, sha256, path in stored:
+        if sha256 not in existing:
+            to_parse.setdefault(sha256, (file, path))
+
+    # all new files parse concurrently, bounded by the shared process pool
+    results = await asyncio.gather(*(parse_pdf(path) for _, path in to_parse.values()), return_exceptions=True)
+    parsed_by_sha = dict(zip(to_parse, results))
+
+    paper_rows = []
+    for sha256, (file, _) in to_parse.items():
+        parsed = parsed_by_sha[sha256]
+        if isinstance(parsed, Exception):
+            raise HTTPException(
+                status_code=400,
+                detail=f"File {file.filename} could not be read as a PDF: {parsed}"
+            )
+
+        # Fall back to the filename when the PDF has no usable title
+        filename_title = file.filename.replace('.pdf', '').strip() if file.filename else f"Paper_{sha256[:12]}"
+
+        paper_rows.append({
+            "source": "uploaded",
+            "source_id": sha256,
+            "title": parsed["title"] or filename_title,
+            "year": None,
+            "doi": None,
+            "abstract": parsed["abstract"],
+            "full_text": parsed["full_text"],
+            "url": None,
+        })
+
     try:
-        for file in files:
-            if file.content_type != 'application/pdf':
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File {file.filename} is not a PDF"
-                )
-            
-            # Use filename as title
-            title = file.filename.replace('.pdf', '').strip() if file.filename else f"Paper_{uuid.uuid4()}"
-            
-            # Create paper entry
-            paper_data = {
-                "source": "uploaded",
-                "source_id": str(uuid.uuid4()),
-                "title": title,
-                "year": None,
-                "doi": None,
-                "abstract": None,
-                "url": None,
-            }
-            
-            paper = upsert_paper(db, paper_data)
-            link_paper_to_run(db, run_id, paper.id)
-            
-            uploaded_papers.append({
-                "id": paper.id,
-                "title": paper.title,
-                "source_id": paper.source_id
-            })
-    
-    except HTTPException:
-        db.rollback()
-        raise
+        reused_ids = [p["id"] for p in existing.values()]
+        papers = await run_in_threadpool(_save_uploaded_papers, db, run_id, paper_rows, reused_ids)
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
+
+    by_sha = {**existing, **{p["source_id"]: p for p in papers}}
+    uploaded_papers = []
+    for file, sha256, _ in stored:
+        p = by_sha[sha256]
+        parsed = parsed_by_sha.get(sha256)
+        uploaded_papers.append({
+            "id": p["id"],
+            "title": p["title"],
+            "source_id": p["source_id"],
+            "reused": sha256 in existing,
+            "pages": parsed["pages"] if parsed else None,
+            "parse_seconds": round(parsed["seconds"], 3) if parsed else None,
+            "parse_ms_per_page": round(1000 * parsed["seconds"] / parsed["pages"], 1) if parsed and parsed["pages"] else None,
+        })
     
     return {
         "run_id": run_id,
@@ -107,6 +221,17 @@ def execute_run_endpoint(run_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Run not found")
     if run.status != "created":
         raise HTTPException(status_code=400, detail="Only runs with status 'created' can be executed")
-    execute_run(db, run)
-    return {"message": "Run execution started", "run_id": run_id}
+    run = enqueue_run(db, run)
+    return {"message": "Run queued for execution", "run_id": run_id, "status": run.status}
+
 
+@router.post("/{run_id}/resume")
+def resume_run_endpoint(run_id: int, db: Session = Depends(get_db)):
+    """Re-queue a failed run; it continues from its last completed node"""
+    run = db.get(Run, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if run.status != RunStatus.FAILED.value:
+        raise HTTPException(status_code=400, detail="Only failed runs can be resumed")
+    run = resume_run(db, run)
+    return {"message": "Run queued to resume", "run_id": run_id, "status": run.status}
@@ -2,6 +2,7 @@ from enum import Enum
 
 class RunStatus(Enum):
     CREATED = "created"
+    QUEUED = "queued"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
\ No newline at end of file
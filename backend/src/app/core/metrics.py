@@ -0,0 +1,87 @@
+"""
+Prometheus metrics shared by the API and the run workers.
+
+The API serves them at GET /metrics; each worker process serves its own
+registry on WORKER_METRICS_PORT (graph nodes and LLM calls run there).
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# LLM calls and whole graph nodes run from sub-second to minutes
+_SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120, 300, 600)
+
+GRAPH_NODE_SECONDS = Histogram(
+    "research_agent_graph_node_duration_seconds",
+    "Wall-clock time of a lit-review graph node",
+    ["node", "outcome"],
+    buckets=_SLOW_BUCKETS,
+)
+
+OPENAI_CALL_SECONDS = Histogram(
+    "research_agent_openai_call_duration_seconds",
+    "Latency of OpenAI API calls by call type (embed, extract, review, summarize)",
+    ["call", "outcome"],
+    buckets=_SLOW_BUCKETS,
+)
+
+OPENALEX_FETCH_SECONDS = Histogram(
+    "research_agent_openalex_fetch_duration_seconds",
+    "Latency of OpenAlex requests, including retries and rate-limit waits",
+    ["outcome"],
+)
+
+PDF_PAGE_PARSE_SECONDS = Histogram(
+    "research_agent_pdf_page_parse_duration_seconds",
+    "Text extraction time per page of uploaded PDFs",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+OPENAI_ADMISSION_WAIT_SECONDS = Histogram(
+    "research_agent_openai_admission_wait_seconds",
+    "Time OpenAI calls waited for the RPM/TPM governor and a concurrency slot",
+    ["lane"],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 2.5, 5, 10, 20, 40, 60),
+)
+
+CACHE_REQUESTS = Counter(
+    "research_agent_cache_requests_total",
+    "Cache lookups by cache (retrieval, extraction, embedding, llm_response) and result",
+    ["cache", "result"],
+)
+
+RUNS_QUEUED = Gauge(
+    "research_agent_runs_queued",
+    "Runs waiting for a worker (read from the runs table on scrape)",
+)
+
+RUNS_IN_FLIGHT = Gauge(
+    "research_agent_runs_in_flight",
+    "Runs currently executing across all workers (read from the runs table on scrape)",
+)
+
+WORKER_RUNS_IN_FLIGHT = Gauge(
+    "research_agent_worker_runs_in_flight",
+    "Runs executing in this worker process",
+)
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Time a block into `histogram`, labelling it outcome=ok|error."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.labels(outcome=outcome, **labels).observe(time.perf_counter() - start)
+
+
+def count_cache(cache: str, hits: int = 0, misses: int = 0) -> None:
+    if hits:
+        CACHE_REQUESTS.labels(cache=cache, result="hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache=cache, result="miss").inc(misses)
@@ -8,6 +8,101 @@ class Settings:
     APP_ENV: str = os.getenv("APP_ENV", "local")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    OPENAI_EMBED_MODEL: str = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    ASYNC_DB_POOL_SIZE: int = int(os.getenv("ASYNC_DB_POOL_SIZE", "10"))
+    ASYNC_DB_MAX_OVERFLOW: int = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "20"))
+
+    # Run queue / worker pool
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    WORKER_POLL_INTERVAL_SECONDS: float = float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "2"))
+    WORKER_HEARTBEAT_SECONDS: float = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "15"))
+    WORKER_STALE_AFTER_SECONDS: float = float(os.getenv("WORKER_STALE_AFTER_SECONDS", "120"))
+    WORKER_MAX_ATTEMPTS: int = int(os.getenv("WORKER_MAX_ATTEMPTS", "3"))
+    WORKER_METRICS_PORT: int = int(os.getenv("WORKER_METRICS_PORT", "9100"))  # 0 disables
+
+    # OpenAI admission control: "postgres" (shared by all processes), "local" or "off"
+    OPENAI_GOVERNOR: str = os.getenv("OPENAI_GOVERNOR", "postgres")
+    OPENAI_RPM: int = int(os.getenv("OPENAI_RPM", "500"))
+    OPENAI_TPM: int = int(os.getenv("OPENAI_TPM", "200000"))
+    # share of each budget the bulk lane (batch runs) must leave to interactive runs
+    OPENAI_BULK_RESERVE: float = float(os.getenv("OPENAI_BULK_RESERVE", "0.25"))
+    OPENAI_MAX_CONCURRENT_CALLS: int = int(os.getenv("OPENAI_MAX_CONCURRENT_CALLS", "16"))  # per process
+
+    # Max papers whose OpenAI calls are in flight at once during extraction
+    EXTRACTION_CONCURRENCY: int = int(os.getenv("EXTRACTION_CONCURRENCY", "8"))
+
+    # Uploaded PDFs: parser processes and read size when streaming uploads to disk
+    PDF_PARSE_WORKERS: int = int(os.getenv("PDF_PARSE_WORKERS", "2"))
+    UPLOAD_CHUNK_BYTES: int = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+    MAX_UPLOAD_FILES: int = int(os.getenv("MAX_UPLOAD_FILES", "200"))
+    # content-addressed store for uploaded files (sha256 -> file)
+    BLOB_STORE_DIR: str = os.getenv("BLOB_STORE_DIR", "data/blobs")
+
+    # Stream the synthesis completion and write partial artifacts as it arrives
+    SYNTHESIS_STREAMING: bool = os.getenv("SYNTHESIS_STREAMING", "true").lower() == "true"
+    SYNTHESIS_STREAM_FLUSH_SECONDS: float = float(os.getenv("SYNTHESIS_STREAM_FLUSH_SECONDS", "0.5"))
+
+    # Evidence selection for synthesis (MMR ranking, packed to a token budget)
+    EVIDENCE_TOKEN_BUDGET: int = int(os.getenv("EVIDENCE_TOKEN_BUDGET", "6000"))
+    EVIDENCE_MMR_LAMBDA: float = float(os.getenv("EVIDENCE_MMR_LAMBDA", "0.7"))
+    # Full-text passages retrieved per run (0 disables) and their share of the budget
+    EVIDENCE_CHUNKS_K: int = int(os.getenv("EVIDENCE_CHUNKS_K", "8"))
+    EVIDENCE_CHUNK_TOKEN_BUDGET: int = int(os.getenv("EVIDENCE_CHUNK_TOKEN_BUDGET", "2000"))  # capped at half of EVIDENCE_TOKEN_BUDGET
+
+    # Full-text chunking (estimated tokens, see openai_client.estimate_tokens)
+    CHUNK_TOKENS: int = int(os.getenv("CHUNK_TOKENS", "400"))
+    CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "60"))
+
+    # Synthesis over large runs: "single" prompt, hierarchical "map_reduce",
+    # or "auto" (map-reduce once the evidence exceeds EVIDENCE_TOKEN_BUDGET)
+    SYNTHESIS_MODE: str = os.getenv("SYNTHESIS_MODE", "auto")
+    SYNTHESIS_BATCH_TOKENS: int = int(os.getenv("SYNTHESIS_BATCH_TOKENS", "4000"))
+    SYNTHESIS_MAP_CONCURRENCY: int = int(os.getenv("SYNTHESIS_MAP_CONCURRENCY", "4"))
+
+    # Near-duplicate detection between retrieval and extraction
+    DEDUP_TITLE_THRESHOLD: float = float(os.getenv("DEDUP_TITLE_THRESHOLD", "0.8"))  # estimated Jaccard
+    DEDUP_MINHASH_PERMUTATIONS: int = int(os.getenv("DEDUP_MINHASH_PERMUTATIONS", "64"))
+    DEDUP_LSH_BANDS: int = int(os.getenv("DEDUP_LSH_BANDS", "16"))
+    # also match against stored papers by abstract embedding (embeds before extraction)
+    DEDUP_EMBEDDING_CHECK: bool = os.getenv("DEDUP_EMBEDDING_CHECK", "false").lower() == "true"
+    DEDUP_EMBEDDING_THRESHOLD: float = float(os.getenv("DEDUP_EMBEDDING_THRESHOLD", "0.97"))
+
+    # pgvector HNSW search (higher ef_search = better recall, slower queries)
+    HNSW_EF_SEARCH: int = int(os.getenv("HNSW_EF_SEARCH", "40"))
+    # keep scanning the index until filtered queries fill their LIMIT
+    # (pgvector >= 0.8; empty disables)
+    HNSW_ITERATIVE_SCAN: str = os.getenv("HNSW_ITERATIVE_SCAN", "relaxed_order")
+    # ANN candidates come from a compact index ("halfvec" or "binary") and are
+    # re-ranked exactly on the full vector; "exact" skips the index entirely
+    VECTOR_INDEX_MODE: str = os.getenv("VECTOR_INDEX_MODE", "halfvec")
+    # candidates fetched per requested result (binary usually needs more than halfvec)
+    VECTOR_RERANK_FACTOR: int = int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+    # GET /papers/similar/recall runs exact scans over all embeddings; tuning only
+    VECTOR_RECALL_ENDPOINT: bool = os.getenv("VECTOR_RECALL_ENDPOINT", "false").lower() == "true"
+
+    # LLM response cache (in-process LRU in front of the llm_cache table)
+    LLM_CACHE_TTL_HOURS: int = int(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+    LLM_CACHE_MEMORY_ENTRIES: int = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+    # OpenAlex retrieval cache
+    RETRIEVAL_CACHE_TTL_HOURS: int = int(os.getenv("RETRIEVAL_CACHE_TTL_HOURS", "24"))
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "10000"))
+
+    # OpenAlex retrieval
+    RETRIEVAL_MAX_RESULTS: int = int(os.getenv("RETRIEVAL_MAX_RESULTS", "10"))
+    OPENALEX_PER_PAGE: int = int(os.getenv("OPENALEX_PER_PAGE", "50"))  # OpenAlex allows up to 200
+    OPENALEX_PAGE_CONCURRENCY: int = int(os.getenv("OPENALEX_PAGE_CONCURRENCY", "4"))
+    OPENALEX_MAILTO: str = os.getenv("OPENALEX_MAILTO", "")
+    OPENALEX_RATE_PER_SECOND: float = float(os.getenv("OPENALEX_RATE_PER_SECOND", "8"))  # API cap is 10/s; 0 disables
+
+    # Shared HTTP client for scholarly sources
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "20"))
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "4"))
+    HTTP_BACKOFF_BASE_SECONDS: float = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.5"))
+    HTTP_BACKOFF_MAX_SECONDS: float = float(os.getenv("HTTP_BACKOFF_MAX_SECONDS", "20"))
+
+    CACHE_MAINTENANCE_INTERVAL_SECONDS: float = float(os.getenv("CACHE_MAINTENANCE_INTERVAL_SECONDS", "600"))
 
 settings = Settings()
\ No newline at end of file
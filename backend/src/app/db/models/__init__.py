@@ -4,4 +4,8 @@ from .run_paper import RunPaper  # noqa: F401
 from .extraction import Extraction  # noqa: F401
 from .artifact import Artifact  # noqa: F401
 from .embedding import Embedding  # noqa: F401
-from .retrieval_cache import RetrievalCache  # noqa: F401
\ No newline at end of file
+from .embedding_cache import EmbeddingCache  # noqa: F401
+from .retrieval_cache import RetrievalCache  # noqa: F401
+from .llm_cache import LLMCache  # noqa: F401
+from .paper_alias import PaperAlias  # noqa: F401
+from .rate_limit_bucket import RateLimitBucket  # noqa: F401
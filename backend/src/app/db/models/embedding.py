@@ -1,25 +1,67 @@
-from sqlalchemy import Integer, ForeignKey, String, DateTime, func
+from sqlalchemy import Integer, ForeignKey, String, Text, DateTime, Index, cast, func, text
 from sqlalchemy.orm import Mapped, mapped_column
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
 from src.app.db.base import Base
 
+# Size of every stored vector. Must match the VECTOR(1536) columns and the
+# halfvec/bit indexes created by the migrations; changing it needs a new one.
+EMBEDDING_DIMENSIONS = 1536
+
 class Embedding(Base):
     __tablename__ = "embeddings"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
-    # what the embedding is for: "paper_abstract", "claim"
+    # what the embedding is for: "paper_abstract", "chunk", "claim"
     kind: Mapped[str] = mapped_column(String(50), nullable=False)
 
     # optional links
     paper_id: Mapped[int | None] = mapped_column(ForeignKey("papers.id", ondelete="CASCADE"), nullable=True, index=True)
     run_id: Mapped[int | None] = mapped_column(ForeignKey("runs.id", ondelete="CASCADE"), nullable=True, index=True)
 
-    # store the vector (dimension will depend on your embedding model; 1536 is common)
-    vector: Mapped[list[float]] = mapped_column(Vector(1536), nullable=False)
+    # embedding model that produced the vector; lookups only match the current model
+    model: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # content-addressed source of the vector (see EmbeddingCache)
+    cache_id: Mapped[int | None] = mapped_column(ForeignKey("embedding_cache.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    # for kind="chunk": the passage text and its position in the paper
+    content: Mapped[str | None] = mapped_column(Text, nullable=True)
+    chunk_index: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # full-precision copy of the cached vector: indexed (compactly) below and used for re-ranking
+    vector: Mapped[list[float]] = mapped_column(Vector(EMBEDDING_DIMENSIONS), nullable=False)
 
     created_at: Mapped[str] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
         nullable=False
     )
+
+
+# Compact ANN indexes for paper similarity, partial so other kinds stay out.
+# Both are expression indexes over the full-precision column, which stays the
+# source of truth for the exact re-rank (see similarity_service).
+Index(
+    "ix_embeddings_halfvec_hnsw_paper_abstract",
+    cast(Embedding.__table__.c.vector, HALFVEC(EMBEDDING_DIMENSIONS)).label("vector_halfvec"),
+    postgresql_using="hnsw",
+    postgresql_with={"m": 16, "ef_construction": 64},
+    postgresql_ops={"vector_halfvec": "halfvec_cosine_ops"},
+    postgresql_where=text("kind = 'paper_abstract'"),
+)
+Index(
+    "ix_embeddings_bit_hnsw_paper_abstract",
+    cast(func.binary_quantize(Embedding.__table__.c.vector), BIT(EMBEDDING_DIMENSIONS)).label("vector_bit"),
+    postgresql_using="hnsw",
+    postgresql_with={"m": 16, "ef_construction": 64},
+    postgresql_ops={"vector_bit": "bit_hamming_ops"},
+    postgresql_where=text("kind = 'paper_abstract'"),
+)
+Index(
+    "ix_embeddings_halfvec_hnsw_chunk",
+    cast(Embedding.__table__.c.vector, HALFVEC(EMBEDDING_DIMENSIONS)).label("vector_halfvec"),
+    postgresql_using="hnsw",
+    postgresql_with={"m": 16, "ef_construction": 64},
+    postgresql_ops={"vector_halfvec": "halfvec_cosine_ops"},
+    postgresql_where=text("kind = 'chunk'"),
+)
@@ -0,0 +1,29 @@
+from sqlalchemy import Integer, String, DateTime, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+from pgvector.sqlalchemy import Vector
+from src.app.db.base import Base
+from src.app.db.models.embedding import EMBEDDING_DIMENSIONS
+
+
+class EmbeddingCache(Base):
+    """One vector per distinct (model, dimensions, normalized text)."""
+    __tablename__ = "embedding_cache"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    dimensions: Mapped[int] = mapped_column(Integer, nullable=False)
+    # sha256 hex of the whitespace-normalized text that was embedded
+    text_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    vector: Mapped[list[float]] = mapped_column(Vector(EMBEDDING_DIMENSIONS), nullable=False)
+
+    created_at: Mapped[str] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint("model", "dimensions", "text_hash", name="uq_embedding_cache_key"),
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy import Integer, String, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from src.app.db.base import Base
+
+
+class LLMCache(Base):
+    __tablename__ = "llm_cache"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    # sha256 over (model, temperature, prompt version, inputs)
+    cache_key: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    response: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_hit_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[str] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
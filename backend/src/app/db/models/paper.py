@@ -14,9 +14,13 @@ class Paper(Base):
     title: Mapped[str] = mapped_column(Text, nullable=False)
     year: Mapped[int | None] = mapped_column(Integer, nullable=True)
     doi: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    # lowercased, prefix-free DOI used for duplicate detection (see utils.doi)
+    doi_normalized: Mapped[str | None] = mapped_column(String(200), nullable=True, index=True)
 
     abstract: Mapped[str | None] = mapped_column(Text, nullable=True)
     url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # body text of uploaded PDFs (not part of paper_to_dict; it can be large)
+    full_text: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[str] = mapped_column(
         DateTime(timezone=True),
@@ -0,0 +1,23 @@
+from sqlalchemy import Integer, Float, String, ForeignKey, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from src.app.db.base import Base
+
+
+class PaperAlias(Base):
+    """A paper found to duplicate another one; work is done on the canonical paper only."""
+    __tablename__ = "paper_aliases"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    paper_id: Mapped[int] = mapped_column(ForeignKey("papers.id", ondelete="CASCADE"), nullable=False, unique=True)
+    canonical_paper_id: Mapped[int] = mapped_column(ForeignKey("papers.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # "doi", "title" or "embedding"
+    reason: Mapped[str] = mapped_column(String(20), nullable=False)
+    similarity: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    created_at: Mapped[str] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import Float, String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from src.app.db.base import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket shared by every process (see tools/openai_governor.py)."""
+    __tablename__ = "rate_limit_buckets"
+
+    # e.g. "openai:rpm", "openai:tpm"
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    capacity: Mapped[float] = mapped_column(Float, nullable=False)
+    refill_per_second: Mapped[float] = mapped_column(Float, nullable=False)
+
+    updated_at: Mapped[str] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from src.app.db.base import Base
 
@@ -7,7 +7,16 @@ class RetrievalCache(Base):
     __tablename__ = "retrieval_cache"
 
     id = Column(Integer, primary_key=True)
-    topic = Column(String(500), nullable=False, index=True)
+    topic = Column(String(500), nullable=False)             # topic as first requested
+    normalized_topic = Column(String(500), nullable=False)  # lookup key (see normalize_topic)
     source = Column(String(50), nullable=False)  # openalex
+    query_params = Column(String(500), nullable=False, default="", server_default="")  # canonical json
     payload = Column(Text, nullable=False)       # json string
+    hit_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("normalized_topic", "source", "query_params", name="uq_retrieval_cache_key"),
+        Index("ix_retrieval_cache_last_hit_at", "last_hit_at"),
+    )
@@ -8,7 +8,7 @@ class Run(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     topic: Mapped[str] = mapped_column(String(300), nullable=False)
-    status: Mapped[RunStatus] = mapped_column(String(50), nullable=False, default=RunStatus.CREATED.value)
+    status: Mapped[RunStatus] = mapped_column(String(50), nullable=False, default=RunStatus.CREATED.value, index=True)
 
     # Store filters or extra info as text for now (we'll improve later)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -16,6 +16,17 @@ class Run(Base):
     # Whether user uploaded papers or agent retrieves them
     upload_papers: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
+    # Runs submitted together share a batch_id and are executed together,
+    # so papers common to several topics are extracted once
+    batch_id: Mapped[str | None] = mapped_column(String(36), nullable=True, index=True)
+
+    # Queue bookkeeping: which worker owns the run and when it last checked in
+    worker_id: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    heartbeat_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    started_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
     created_at: Mapped[str] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
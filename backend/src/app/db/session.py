@@ -1,7 +1,24 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from src.app.core.settings import settings
 
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async stack for read-heavy endpoints; postgresql+psycopg URLs pick the
+# psycopg async driver automatically.
+async_engine = create_async_engine(
+    settings.DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=settings.ASYNC_DB_POOL_SIZE,
+    max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def libpq_url() -> str:
+    """DATABASE_URL for plain psycopg/libpq clients (postgresql+psycopg://... -> postgresql://...)."""
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
@@ -0,0 +1,41 @@
+"""
+Postgres-backed LangGraph checkpointer.
+
+State is saved after every node under thread_id "run-<run_id>", so a failed
+run resumes at the node that failed instead of starting over. One
+connection pool per process, shared by all worker threads.
+"""
+import threading
+from typing import Optional
+
+from langgraph.checkpoint.postgres import PostgresSaver
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+
+from src.app.db.session import libpq_url
+
+_saver: Optional[PostgresSaver] = None
+_lock = threading.Lock()
+
+
+def run_thread_id(run_id: int) -> str:
+    return f"run-{run_id}"
+
+
+def get_checkpointer() -> PostgresSaver:
+    global _saver
+    if _saver is None:
+        with _lock:
+            if _saver is None:
+                pool = ConnectionPool(
+                    libpq_url(),
+                    max_size=8,
+                    # settings PostgresSaver requires of its connections
+                    kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+                    open=True,
+                )
+                saver = PostgresSaver(pool)
+                # creates/migrates the checkpoint tables; idempotent
+                saver.setup()
+                _saver = saver
+    return _saver
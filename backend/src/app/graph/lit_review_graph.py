@@ -1,17 +1,51 @@
+import time
+from typing import Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
 
+from src.app.core.metrics import GRAPH_NODE_SECONDS, observe
 from src.app.graph.state import AgentState
+from src.app.services.run_events_service import publish_run_event
 from src.app.agents.retriever import retriever_agent
+from src.app.agents.deduplicator import dedup_agent
 from src.app.agents.extractor import extractor_agent
 from src.app.agents.synthesizer import synthesizer_agent
 
 
-def build_lit_review_graph():
+def _instrumented(name: str, node):
+    """Wrap a node with its duration histogram and start/finish progress events."""
+    def run(state: AgentState, config: RunnableConfig) -> AgentState:
+        run_id = state["run_id"]
+        publish_run_event(run_id, "node_started", node=name)
+        start = time.perf_counter()
+        with observe(GRAPH_NODE_SECONDS, node=name):
+            result = node(state, config)
+        publish_run_event(run_id, "node_finished", node=name, seconds=round(time.perf_counter() - start, 3))
+        return result
+    return run
+
+
+_NODES = {
+    "retriever": retriever_agent,
+    "dedup": dedup_agent,
+    "extractor": extractor_agent,
+    "synthesizer": synthesizer_agent,
+}
+
+
+def instrumented_nodes():
+    """The graph's nodes, wrapped as in the graph, for callers that schedule them themselves (batches)."""
+    return {name: _instrumented(name, node) for name, node in _NODES.items()}
+
+
+def build_lit_review_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
+    """With a checkpointer, state is saved after each node and an interrupted thread can be resumed."""
     g = StateGraph(AgentState)
 
-    g.add_node("retriever", retriever_agent)
-    g.add_node("extractor", extractor_agent)
-    g.add_node("synthesizer", synthesizer_agent)
+    for name, node in instrumented_nodes().items():
+        g.add_node(name, node)
 
     # Entry point: start with a decision node
     def _route_entry(state: AgentState) -> str:
@@ -22,8 +56,9 @@ def build_lit_review_graph():
     
     g.set_entry_point("retriever")
     
-    # From retriever to extractor
-    g.add_edge("retriever", "extractor")
+    # From retriever to dedup, then extractor
+    g.add_edge("retriever", "dedup")
+    g.add_edge("dedup", "extractor")
     
     # From extractor to synthesizer
     g.add_edge("extractor", "synthesizer")
@@ -31,4 +66,4 @@ def build_lit_review_graph():
     # From synthesizer to END
     g.add_edge("synthesizer", END)
 
-    return g.compile()
+    return g.compile(checkpointer=checkpointer)
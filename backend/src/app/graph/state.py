@@ -1,9 +1,11 @@
 from typing import TypedDict, List, Dict, Any, Optional
+from langchain_core.runnables import RunnableConfig
 from sqlalchemy.orm import Session
 
 
 class AgentState(TypedDict, total=False):
-    db: Session
+    # Checkpointed after every node, so only serializable values belong
+    # here; the DB session travels in config["configurable"]["db"].
     run_id: int
     topic: str
     upload_papers: bool
@@ -14,3 +16,8 @@ class AgentState(TypedDict, total=False):
     synthesis: Optional[str]
     gaps: Optional[str]
     hypotheses: Optional[str]
+
+
+def graph_db(config: RunnableConfig) -> Session:
+    """The DB session of the current graph invocation."""
+    return config["configurable"]["db"]
@@ -1,8 +1,13 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from src.app.core.settings import settings
 from src.app.api.routes.health import router as health_router
 from src.app.api.routes.run import router as run_router
 from src.app.api.routes.artifacts import router as artifacts_router
+from src.app.api.routes.metrics import router as metrics_router
+from src.app.api.routes.papers import router as papers_router
+from src.app.services.pdf_ingest_service import shutdown_pdf_pool
 from fastapi.middleware.cors import CORSMiddleware
 
 origins = [
@@ -10,10 +15,18 @@ origins = [
     "http://localhost:5176",
 ]
  
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_pdf_pool()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     description="AI system for automated literature review and hypothesis generation",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -27,3 +40,5 @@ app.add_middleware(
 app.include_router(health_router)
 app.include_router(run_router)
 app.include_router(artifacts_router)
+app.include_router(papers_router)
+app.include_router(metrics_router)
@@ -1,18 +1,27 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, List, Optional
 
 class RunCreate(BaseModel):
     topic: str = Field(..., min_length=3, max_length=300)
     notes: Optional[str] = None
     upload_papers: bool = Field(default=False, description="If true, user uploads papers; if false, agent retrieves papers")
 
+class RunBatchCreate(BaseModel):
+    topics: List[Annotated[str, Field(min_length=3, max_length=300)]] = Field(..., min_length=1, max_length=100)
+    notes: Optional[str] = None
+
 class RunOut(BaseModel):
     id: int
     topic: str
     status: str
     notes: Optional[str] = None
     upload_papers: bool
+    batch_id: Optional[str] = None
     created_at: datetime
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RunBatchOut(BaseModel):
+    batch_id: str
+    runs: List[RunOut]
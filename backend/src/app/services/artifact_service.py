@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.app.db.models.artifact import Artifact
 
@@ -7,4 +9,29 @@ def save_artifact(db: Session, run_id: int, kind: str, content: str) -> Artifact
     db.add(a)
     db.commit()
     db.refresh(a)
-    return a
\ No newline at end of file
+    return a
+
+
+def upsert_artifact(db: Session, run_id: int, kind: str, content: str) -> Artifact:
+    """
+    Keep one artifact per (run, kind): overwrite it if it exists.
+    Used for streamed partial content that is refined until the final version.
+    """
+    stmt = (
+        select(Artifact)
+        .where(Artifact.run_id == run_id, Artifact.kind == kind)
+        .order_by(Artifact.id.desc())
+        .limit(1)
+    )
+    a = db.execute(stmt).scalar_one_or_none()
+    if a is None:
+        return save_artifact(db, run_id, kind, content)
+
+    a.content = content
+    db.commit()
+    return a
+
+
+async def list_artifacts_async(db: AsyncSession, run_id: int) -> list[Artifact]:
+    result = await db.execute(select(Artifact).where(Artifact.run_id == run_id))
+    return list(result.scalars().all())
@@ -0,0 +1,57 @@
+"""
+Local content-addressed blob store for uploaded files.
+
+A blob lives at BLOB_STORE_DIR/<h[:2]>/<h[2:4]>/<h>, where h is the sha256
+of its bytes, so identical uploads share one file and one paper row.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Tuple
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from src.app.core.settings import settings
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(settings.BLOB_STORE_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def _publish(tmp_path: str, sha256: str) -> str:
+    path = blob_path(sha256)
+    if os.path.exists(path):
+        # already stored: identical content by construction
+        os.unlink(tmp_path)
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # atomic on the same filesystem, so readers never see a partial blob
+    os.replace(tmp_path, path)
+    return path
+
+
+async def store_upload(file: UploadFile) -> Tuple[str, str, int]:
+    """
+    Stream the upload into the store chunk by chunk, hashing as it goes.
+    Memory use is bounded by UPLOAD_CHUNK_BYTES. Returns (sha256, path, size).
+    """
+    tmp_dir = os.path.join(settings.BLOB_STORE_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_BYTES):
+                digest.update(chunk)
+                size += len(chunk)
+                await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    sha256 = digest.hexdigest()
+    path = await run_in_threadpool(_publish, tmp_path, sha256)
+    return sha256, path, size
@@ -0,0 +1,72 @@
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.app.core.settings import settings
+from src.app.db.models.embedding import Embedding
+from src.app.db.models.paper import Paper
+from src.app.services.embedding_service import get_or_create_cached_vectors
+from src.app.tools.openai_client import embed_model
+from src.app.utils.chunking import split_into_chunks
+
+
+def _papers_with_chunks(db: Session, paper_ids: List[int]) -> set:
+    stmt = (
+        select(Embedding.paper_id)
+        .where(
+            Embedding.kind == "chunk",
+            Embedding.model == embed_model(),
+            Embedding.paper_id.in_(paper_ids),
+        )
+        .distinct()
+    )
+    return set(db.execute(stmt).scalars())
+
+
+def chunk_and_embed_papers(db: Session, paper_ids: List[int]) -> Dict[int, int]:
+    """
+    Split the full text of each paper that has one (and no chunks for the
+    current model yet) into overlapping token-bounded chunks, embed them all
+    through the embedding cache in batched requests and store them as
+    kind="chunk" embeddings. Returns {paper_id: chunks created}.
+    """
+    if not paper_ids:
+        return {}
+
+    done = _papers_with_chunks(db, paper_ids)
+    todo = [pid for pid in dict.fromkeys(paper_ids) if pid not in done]
+    if not todo:
+        return {}
+
+    stmt = select(Paper.id, Paper.full_text).where(Paper.id.in_(todo), Paper.full_text.is_not(None))
+    chunks_by_paper = {
+        paper_id: split_into_chunks(full_text, settings.CHUNK_TOKENS, settings.CHUNK_OVERLAP_TOKENS)
+        for paper_id, full_text in db.execute(stmt).all()
+    }
+
+    pending = [
+        (paper_id, index, chunk)
+        for paper_id, chunks in chunks_by_paper.items()
+        for index, chunk in enumerate(chunks)
+    ]
+    if not pending:
+        return {}
+
+    entries = get_or_create_cached_vectors(db, [chunk for _, _, chunk in pending])
+    db.add_all([
+        Embedding(
+            kind="chunk",
+            paper_id=paper_id,
+            run_id=None,
+            model=entry.model,
+            cache_id=entry.id,
+            content=chunk,
+            chunk_index=index,
+            vector=entry.vector,
+        )
+        for (paper_id, index, chunk), entry in zip(pending, entries)
+    ])
+    db.commit()
+
+    return {paper_id: len(chunks) for paper_id, chunks in chunks_by_paper.items() if chunks}
@@ -0,0 +1,179 @@
+"""
+Near-duplicate paper detection.
+
+Papers are matched by normalized DOI (in the batch and against stored
+papers), by MinHash/LSH over title shingles (within the batch) and,
+optionally, by abstract-embedding cosine similarity against stored papers.
+Each group collapses onto its oldest paper; the others are recorded in
+paper_aliases so later runs resolve them without re-matching.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.app.core.settings import settings
+from src.app.db.models.paper import Paper
+from src.app.db.models.paper_alias import PaperAlias
+from src.app.db.models.run_paper import RunPaper
+from src.app.services.embedding_service import get_or_create_paper_embeddings
+from src.app.services.paper_service import link_papers_to_run, paper_to_dict
+from src.app.services.similarity_service import find_similar_papers
+from src.app.utils.doi import normalize_doi
+from src.app.utils.minhash import MinHasher, estimated_jaccard, lsh_candidate_pairs, shingles
+
+
+@dataclass
+class _Groups:
+    """Union-find over paper ids; the smallest (oldest) id is the root."""
+    parent: Dict[int, int] = field(default_factory=dict)
+    # first evidence that attached a paper to its group: {paper_id: (reason, similarity)}
+    evidence: Dict[int, Tuple[str, Optional[float]]] = field(default_factory=dict)
+
+    def find(self, x: int) -> int:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int, reason: str, similarity: Optional[float] = None) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        keep, drop = min(root_a, root_b), max(root_a, root_b)
+        self.parent[drop] = keep
+        for paper_id in (a, b):
+            if paper_id != keep:
+                self.evidence.setdefault(paper_id, (reason, similarity))
+        self.evidence.setdefault(drop, (reason, similarity))
+
+
+def _existing_aliases(db: Session, paper_ids: List[int]) -> Dict[int, int]:
+    if not paper_ids:
+        return {}
+    stmt = select(PaperAlias.paper_id, PaperAlias.canonical_paper_id).where(PaperAlias.paper_id.in_(paper_ids))
+    return dict(db.execute(stmt).all())
+
+
+def _match_dois(db: Session, papers: List[Dict[str, Any]], groups: _Groups) -> None:
+    by_doi: Dict[str, List[int]] = {}
+    for p in papers:
+        doi = normalize_doi(p.get("doi"))
+        if doi:
+            by_doi.setdefault(doi, []).append(p["id"])
+    if not by_doi:
+        return
+
+    # stored papers carrying the same DOI under another source id
+    stmt = (
+        select(Paper.doi_normalized, Paper.id)
+        .where(Paper.doi_normalized.in_(list(by_doi)))
+        .where(Paper.id.not_in(select(PaperAlias.paper_id)))
+    )
+    for doi, paper_id in db.execute(stmt).all():
+        by_doi[doi].append(paper_id)
+
+    for ids in by_doi.values():
+        for other in ids[1:]:
+            groups.union(ids[0], other, "doi")
+
+
+def _match_titles(papers: List[Dict[str, Any]], groups: _Groups) -> None:
+    hasher = MinHasher(num_perm=settings.DEDUP_MINHASH_PERMUTATIONS)
+    signatures = [hasher.signature(shingles(p.get("title") or "")) for p in papers]
+
+    for i, j in lsh_candidate_pairs(signatures, settings.DEDUP_LSH_BANDS):
+        a, b = papers[i], papers[j]
+        # same title, different year: usually a series or a new edition
+        if a.get("year") and b.get("year") and abs(a["year"] - b["year"]) > 1:
+            continue
+        similarity = estimated_jaccard(signatures[i], signatures[j])
+        if similarity >= settings.DEDUP_TITLE_THRESHOLD:
+            groups.union(a["id"], b["id"], "title", similarity)
+
+
+def _match_embeddings(db: Session, papers: List[Dict[str, Any]], groups: _Groups) -> None:
+    """Nearest stored paper per batch paper; vectors are reused by the extractor."""
+    texts = [(p.get("abstract") or "").strip() or (p.get("title") or "").strip() for p in papers]
+    embeddings = get_or_create_paper_embeddings(db, [p["id"] for p in papers], texts)
+    matches: List[Tuple[int, int, float]] = []
+    for p in papers:
+        emb = embeddings.get(p["id"])
+        if emb is None:
+            continue
+        nearest = find_similar_papers(db, emb.vector, k=1, exclude_paper_ids=[p["id"]])
+        if nearest and nearest[0]["similarity"] >= settings.DEDUP_EMBEDDING_THRESHOLD:
+            matches.append((p["id"], nearest[0]["id"], nearest[0]["similarity"]))
+
+    # a stored neighbour may itself be an alias: join its canonical paper instead
+    aliases = _existing_aliases(db, [other for _, other, _ in matches])
+    for paper_id, other, similarity in matches:
+        groups.union(paper_id, aliases.get(other, other), "embedding", similarity)
+
+
+def collapse_duplicates(db: Session, run_id: int, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Canonical papers for `papers` (first-seen order, no repeats). Duplicates
+    get a paper_aliases row and are unlinked from the run in favour of their
+    canonical paper. Commits.
+    """
+    if not papers:
+        return []
+
+    ids = [p["id"] for p in papers]
+    groups = _Groups()
+
+    # papers already known to be aliases go straight to their canonical paper
+    for paper_id, canonical_id in _existing_aliases(db, ids).items():
+        groups.union(paper_id, canonical_id, "alias")
+
+    _match_dois(db, papers, groups)
+    _match_titles(papers, groups)
+    if settings.DEDUP_EMBEDDING_CHECK:
+        _match_embeddings(db, papers, groups)
+
+    # some matches point outside the batch (stored papers, older aliases)
+    canonical_ids = list(dict.fromkeys(groups.find(pid) for pid in ids))
+    known = {p["id"]: p for p in papers}
+    outside = [cid for cid in canonical_ids if cid not in known]
+    if outside:
+        for paper in db.execute(select(Paper).where(Paper.id.in_(outside))).scalars():
+            known[paper.id] = paper_to_dict(paper)
+
+    new_aliases = [
+        {
+            "paper_id": paper_id,
+            "canonical_paper_id": groups.find(paper_id),
+            "reason": reason,
+            "similarity": similarity,
+        }
+        for paper_id, (reason, similarity) in groups.evidence.items()
+        if groups.find(paper_id) != paper_id and reason != "alias"
+    ]
+    if new_aliases:
+        stmt = insert(PaperAlias).values(new_aliases)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[PaperAlias.paper_id],
+            set_={"canonical_paper_id": stmt.excluded.canonical_paper_id},
+        ))
+        # keep alias chains one hop long
+        for row in new_aliases:
+            db.execute(
+                update(PaperAlias)
+                .where(PaperAlias.canonical_paper_id == row["paper_id"])
+                .values(canonical_paper_id=row["canonical_paper_id"])
+            )
+
+    duplicate_ids = [pid for pid in ids if groups.find(pid) != pid]
+    if duplicate_ids:
+        db.execute(
+            delete(RunPaper).where(RunPaper.run_id == run_id, RunPaper.paper_id.in_(duplicate_ids)),
+            execution_options={"synchronize_session": False},
+        )
+    link_papers_to_run(db, run_id, [cid for cid in canonical_ids if cid in known], commit=False)
+    db.commit()
+
+    return [known[cid] for cid in canonical_ids if cid in known]
@@ -1,35 +1,144 @@
+import hashlib
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from typing import Optional
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, List, Optional
 
+from src.app.core.metrics import count_cache
 from src.app.db.models.embedding import Embedding
-from src.app.tools.openai_client import embed_text
+from src.app.db.models.embedding_cache import EmbeddingCache
+from src.app.tools.openai_client import embed_dimensions, embed_model, embed_texts
 
 
-def get_embedding(db: Session, kind: str, paper_id: int) -> Optional[Embedding]:
-    stmt = (
-        select(Embedding)
-        .where(Embedding.kind == kind, Embedding.paper_id == paper_id)
-        .limit(1)
+def normalize_embedding_text(text: Optional[str]) -> str:
+    """Collapse whitespace so trivially different copies of a text share a cache entry."""
+    return " ".join((text or "").split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _current_model_filter():
+    # vectors from different models live in different spaces and must never be mixed
+    return Embedding.model == embed_model()
+
+
+def get_cached_vectors(db: Session, hashes: List[str]) -> Dict[str, EmbeddingCache]:
+    """Cache entries for the current model/dimensions, keyed by text hash."""
+    if not hashes:
+        return {}
+    stmt = select(EmbeddingCache).where(
+        EmbeddingCache.model == embed_model(),
+        EmbeddingCache.dimensions == embed_dimensions(),
+        EmbeddingCache.text_hash.in_(set(hashes)),
     )
-    return db.execute(stmt).scalar_one_or_none()
+    return {row.text_hash: row for row in db.execute(stmt).scalars()}
 
 
-def get_or_create_paper_embedding(db: Session, paper_id: int, text: str) -> Embedding:
-    kind = "paper_abstract"
-    existing = get_embedding(db, kind=kind, paper_id=paper_id)
-    if existing:
-        return existing
+def get_or_create_cached_vectors(db: Session, texts: List[str]) -> List[Optional[EmbeddingCache]]:
+    """
+    Content-addressed embeddings: each distinct normalized text is embedded
+    once per (model, dimensions). Returns one entry per input text (None for
+    blank texts). New entries are flushed, not committed.
+    """
+    normalized = [normalize_embedding_text(t) for t in texts]
+    hashes = [text_hash(t) if t else None for t in normalized]
+
+    found = get_cached_vectors(db, [h for h in hashes if h])
+
+    missing: Dict[str, str] = {}
+    for h, t in zip(hashes, normalized):
+        if h and h not in found:
+            missing.setdefault(h, t)
+
+    hits = sum(1 for h in hashes if h and h in found)
+    count_cache("embedding_text", hits=hits, misses=len(missing))
+
+    if missing:
+        missing_hashes = list(missing)
+        vectors = embed_texts([missing[h] for h in missing_hashes])
+        stmt = insert(EmbeddingCache).values([
+            {"model": embed_model(), "dimensions": embed_dimensions(), "text_hash": h, "vector": vec}
+            for h, vec in zip(missing_hashes, vectors)
+        ])
+        # a concurrent worker may have cached the same text; keep its row
+        db.execute(stmt.on_conflict_do_nothing(constraint="uq_embedding_cache_key"))
+        found.update(get_cached_vectors(db, missing_hashes))
+
+    return [found.get(h) if h else None for h in hashes]
+
 
-    vec = embed_text(text)
+def get_embeddings_for_papers(db: Session, kind: str, paper_ids: List[int]) -> Dict[int, Embedding]:
+    """Existing embeddings of one kind (for the current model) for a set of papers, keyed by paper_id."""
+    if not paper_ids:
+        return {}
 
-    row = Embedding(
-        kind=kind,
+    stmt = select(Embedding).where(
+        Embedding.kind == kind,
+        Embedding.paper_id.in_(paper_ids),
+        _current_model_filter(),
+    )
+    found: Dict[int, Embedding] = {}
+    for e in db.execute(stmt).scalars():
+        found.setdefault(e.paper_id, e)
+    return found
+
+
+def _paper_embedding_row(paper_id: int, entry: EmbeddingCache) -> Embedding:
+    return Embedding(
+        kind="paper_abstract",
         paper_id=paper_id,
         run_id=None,
-        vector=vec,
+        model=entry.model,
+        cache_id=entry.id,
+        vector=entry.vector,
     )
-    db.add(row)
+
+
+def get_or_create_paper_embeddings(
+    db: Session,
+    paper_ids: List[int],
+    texts: List[str],
+    existing: Optional[Dict[int, Embedding]] = None,
+) -> Dict[int, Embedding]:
+    """
+    Abstract embeddings for a batch of papers.
+    Looks up existing rows in one query and resolves the missing texts
+    through the content-addressed cache, so only texts never seen with the
+    current model reach the API. New rows are inserted in a single commit.
+    Returns {paper_id: Embedding}.
+
+    Pass `existing` (e.g. from prefetch_paper_cache) to skip the lookup query.
+    """
+    kind = "paper_abstract"
+    if not paper_ids:
+        return {}
+
+    if existing is None:
+        found = get_embeddings_for_papers(db, kind=kind, paper_ids=paper_ids)
+    else:
+        found = dict(existing)
+
+    missing_ids: List[int] = []
+    missing_texts: List[str] = []
+    seen = set(found)
+    for paper_id, text in zip(paper_ids, texts):
+        if paper_id in seen or not (text or "").strip():
+            continue
+        seen.add(paper_id)
+        missing_ids.append(paper_id)
+        missing_texts.append(text)
+
+    count_cache("embedding", hits=len(found), misses=len(missing_ids))
+    if not missing_ids:
+        return found
+
+    entries = get_or_create_cached_vectors(db, missing_texts)
+    rows = [_paper_embedding_row(paper_id, entry) for paper_id, entry in zip(missing_ids, entries)]
+    db.add_all(rows)
     db.commit()
-    db.refresh(row)
-    return row
+
+    for paper_id, row in zip(missing_ids, rows):
+        found[paper_id] = row
+    return found
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from typing import Optional
+from typing import Dict, List
 from src.app.db.models.extraction import Extraction
 
 
@@ -20,11 +20,18 @@ def save_extraction(
     db.refresh(e)
     return e
 
-def get_latest_extraction_for_paper(db: Session, paper_id: int) -> Optional[Extraction]:
+def get_latest_extractions_for_papers(db: Session, paper_ids: List[int]) -> Dict[int, Extraction]:
+    """
+    Latest extraction per paper for a whole set of papers in one query
+    (SELECT DISTINCT ON (paper_id) ... ORDER BY paper_id, id DESC).
+    """
+    if not paper_ids:
+        return {}
+
     stmt = (
         select(Extraction)
-        .where(Extraction.paper_id == paper_id)
-        .order_by(Extraction.id.desc())
-        .limit(1)
+        .where(Extraction.paper_id.in_(paper_ids))
+        .distinct(Extraction.paper_id)
+        .order_by(Extraction.paper_id, Extraction.id.desc())
     )
-    return db.execute(stmt).scalar_one_or_none()
\ No newline at end of file
+    return {e.paper_id: e for e in db.execute(stmt).scalars()}
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.app.core.metrics import count_cache
+from src.app.core.settings import settings
+from src.app.db.models.llm_cache import LLMCache
+from src.app.tools.openai_client import (
+    REVIEW_PROMPT_VERSION,
+    REVIEW_TEMPERATURE,
+    chat_model,
+    generate_review_outputs,
+)
+
+
+class _LRU:
+    """Small thread-safe LRU with per-entry TTL, used as the in-process tier."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_memory = _LRU(
+    max_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_HOURS * 3600,
+)
+
+def make_cache_key(**parts: Any) -> str:
+    """Content address for an LLM call: sha256 over its canonical JSON inputs."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(db: Session, cache_key: str) -> Optional[Dict[str, Any]]:
+    value = _memory.get(cache_key)
+    if value is not None:
+        count_cache("llm_response", hits=1)
+        return value
+
+    fresh_after = func.now() - timedelta(hours=settings.LLM_CACHE_TTL_HOURS)
+    stmt = (
+        update(LLMCache)
+        .where(LLMCache.cache_key == cache_key, LLMCache.created_at > fresh_after)
+        .values(hit_count=LLMCache.hit_count + 1, last_hit_at=func.now())
+        .returning(LLMCache.response)
+    )
+    value = db.execute(stmt).scalar_one_or_none()
+    db.commit()
+
+    if value is None:
+        count_cache("llm_response", misses=1)
+        return None
+
+    count_cache("llm_response", hits=1)
+    _memory.put(cache_key, value)
+    return value
+
+
+def save_response(db: Session, cache_key: str, model: str, response: Dict[str, Any]) -> None:
+    stmt = insert(LLMCache).values(cache_key=cache_key, model=model, response=response)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LLMCache.cache_key],
+        set_={"response": stmt.excluded.response, "model": stmt.excluded.model, "created_at": func.now()},
+    )
+    db.execute(stmt)
+    db.commit()
+    _memory.put(cache_key, response)
+
+
+def get_or_create_response(
+    db: Session,
+    cache_key: str,
+    model: str,
+    produce: Callable[[], Dict[str, Any]],
+) -> Dict[str, Any]:
+    cached = get_cached_response(db, cache_key)
+    if cached is not None:
+        return cached
+
+    response = produce()
+    save_response(db, cache_key, model, response)
+    return response
+
+
+def get_or_generate_review_outputs(
+    db: Session,
+    topic: str,
+    evidence: str,
+    produce: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    generate_review_outputs behind the two-tier response cache.
+    `produce` replaces the default call on a miss (e.g. a streaming variant).
+    """
+    model = chat_model()
+    key = make_cache_key(
+        kind="review",
+        model=model,
+        temperature=REVIEW_TEMPERATURE,
+        prompt_version=REVIEW_PROMPT_VERSION,
+        topic=topic.strip(),
+        evidence=evidence,
+    )
+    return get_or_create_response(
+        db, key, model, produce or (lambda: generate_review_outputs(topic=topic, evidence=evidence))
+    )
+
+
+def evict_llm_cache(db: Session) -> int:
+    """Drop expired rows, then the least recently hit rows above the size cap."""
+    expired_before = func.now() - timedelta(hours=settings.LLM_CACHE_TTL_HOURS)
+    removed = db.execute(
+        delete(LLMCache).where(LLMCache.created_at < expired_before),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+
+    keep = (
+        select(LLMCache.id)
+        .order_by(func.coalesce(LLMCache.last_hit_at, LLMCache.created_at).desc())
+        .limit(settings.LLM_CACHE_MAX_ENTRIES)
+    )
+    removed += db.execute(
+        delete(LLMCache).where(LLMCache.id.not_in(keep)),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+
+    db.commit()
+    return removed
@@ -0,0 +1,32 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.app.db.models.embedding import Embedding
+from src.app.db.models.extraction import Extraction
+from src.app.services.embedding_service import get_embeddings_for_papers
+from src.app.services.extraction_service import get_latest_extractions_for_papers
+
+
+@dataclass
+class PaperCache:
+    """
+    What the DB already knows about a set of papers, loaded up front so a
+    graph node does not issue per-paper lookups.
+    """
+    extractions: Dict[int, Extraction] = field(default_factory=dict)
+    embeddings: Dict[int, Embedding] = field(default_factory=dict)
+
+    def extraction_data(self, paper_id: int) -> Optional[Dict[str, Any]]:
+        e = self.extractions.get(paper_id)
+        return e.data if e else None
+
+
+def prefetch_paper_cache(db: Session, paper_ids: List[int]) -> PaperCache:
+    """Two queries total, regardless of how many papers are passed."""
+    ids = [pid for pid in dict.fromkeys(paper_ids) if pid is not None]
+    return PaperCache(
+        extractions=get_latest_extractions_for_papers(db, ids),
+        embeddings=get_embeddings_for_papers(db, kind="paper_abstract", paper_ids=ids),
+    )
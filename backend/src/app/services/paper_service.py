@@ -1,55 +1,109 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import Dict, Any, Optional, List
+from sqlalchemy import Select, select, func
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, Any, List, Tuple
 
 from src.app.db.models.paper import Paper
 from src.app.db.models.run_paper import RunPaper
+from src.app.utils.doi import normalize_doi
 
 
-def upsert_paper(db: Session, data: Dict[str, Any]) -> Paper:
+def paper_to_dict(p: Paper) -> Dict[str, Any]:
+    """Paper row formatted for agent processing"""
+    return {
+        "id": p.id,
+        "source": p.source,
+        "source_id": p.source_id,
+        "title": p.title,
+        "year": p.year,
+        "doi": p.doi,
+        "abstract": p.abstract,
+        "url": p.url,
+    }
+
+
+def upsert_papers(db: Session, rows: List[Dict[str, Any]], commit: bool = True) -> List[Dict[str, Any]]:
+    """
+    Insert or update papers by (source, source_id) with one INSERT ... ON
+    CONFLICT (source, source_id) DO UPDATE ... RETURNING statement for the
+    whole batch.
+
+    A non-empty incoming value wins, otherwise the stored value is kept.
+    Returns paper dicts (see paper_to_dict) in the order of `rows`;
+    duplicates in the input map to the same paper.
+    """
+    if not rows:
+        return []
+
+    fields = ("title", "year", "doi", "abstract", "url", "full_text")
+
+    # Postgres refuses to update the same row twice in one statement,
+    # so merge duplicate keys inside the batch first.
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for data in rows:
+        key = (data.get("source"), data.get("source_id"))
+        current = merged.setdefault(key, {"source": key[0], "source_id": key[1], **{f: None for f in fields}})
+        for f in fields:
+            current[f] = data.get(f) or current[f]
+    for current in merged.values():
+        current["doi_normalized"] = normalize_doi(current["doi"])
+
+    stmt = insert(Paper).values(list(merged.values()))
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_papers_source_sourceid",
+        set_={
+            "title": func.coalesce(func.nullif(excluded.title, ""), Paper.title),
+            "year": func.coalesce(excluded.year, Paper.year),
+            "doi": func.coalesce(func.nullif(excluded.doi, ""), Paper.doi),
+            "doi_normalized": func.coalesce(excluded.doi_normalized, Paper.doi_normalized),
+            "abstract": func.coalesce(func.nullif(excluded.abstract, ""), Paper.abstract),
+            "url": func.coalesce(func.nullif(excluded.url, ""), Paper.url),
+            "full_text": func.coalesce(func.nullif(excluded.full_text, ""), Paper.full_text),
+        },
+    ).returning(Paper)
+
+    result = db.execute(stmt, execution_options={"populate_existing": True})
+    # snapshot before commit expires the instances
+    by_key = {(p.source, p.source_id): paper_to_dict(p) for p in result.scalars().all()}
+
+    if commit:
+        db.commit()
+
+    return [by_key[(data.get("source"), data.get("source_id"))] for data in rows]
+
+
+def get_papers_by_source_ids(db: Session, source: str, source_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Stored papers of one source, keyed by source_id (see paper_to_dict)"""
+    if not source_ids:
+        return {}
+    stmt = select(Paper).where(Paper.source == source, Paper.source_id.in_(set(source_ids)))
+    return {p.source_id: paper_to_dict(p) for p in db.execute(stmt).scalars()}
+
+
+def link_papers_to_run(db: Session, run_id: int, paper_ids: List[int], commit: bool = True) -> int:
     """
-    Insert a paper if (source, source_id) not موجود.
-    Otherwise update basic fields and return the existing record.
+    Link many papers to a run with a single INSERT.
+    Papers that are already linked to the run are skipped.
     """
-    source = data.get("source")
-    source_id = data.get("source_id")
-
-    stmt = select(Paper).where(Paper.source == source, Paper.source_id == source_id)
-    existing: Optional[Paper] = db.execute(stmt).scalar_one_or_none()
-
-    if existing:
-        # update fields if newly available
-        existing.title = data.get("title") or existing.title
-        existing.year = data.get("year") or existing.year
-        existing.doi = data.get("doi") or existing.doi
-        existing.abstract = data.get("abstract") or existing.abstract
-        existing.url = data.get("url") or existing.url
+    wanted = list(dict.fromkeys(paper_ids))
+    if not wanted:
+        return 0
+
+    stmt = select(RunPaper.paper_id).where(RunPaper.run_id == run_id, RunPaper.paper_id.in_(wanted))
+    already = set(db.execute(stmt).scalars().all())
+    new_ids = [pid for pid in wanted if pid not in already]
+
+    if new_ids:
+        db.execute(insert(RunPaper), [{"run_id": run_id, "paper_id": pid} for pid in new_ids])
+    if commit:
         db.commit()
-        db.refresh(existing)
-        return existing
-
-    paper = Paper(
-        source=source,
-        source_id=source_id,
-        title=data.get("title"),
-        year=data.get("year"),
-        doi=data.get("doi"),
-        abstract=data.get("abstract"),
-        url=data.get("url"),
-    )
-    db.add(paper)
-    db.commit()
-    db.refresh(paper)
-    return paper
-
-
-def link_paper_to_run(db: Session, run_id: int, paper_id: int) -> RunPaper:
-    """Link a paper to a run"""
-    run_paper = RunPaper(run_id=run_id, paper_id=paper_id)
-    db.add(run_paper)
-    db.commit()
-    db.refresh(run_paper)
-    return run_paper
+    return len(new_ids)
+
+
+def run_paper_ids(run_id: int) -> Select:
+    """SELECT of the run's paper ids (its run_papers links)."""
+    return select(RunPaper.paper_id).where(RunPaper.run_id == run_id)
 
 
 def get_papers_for_run(db: Session, run_id: int) -> List[Dict[str, Any]]:
@@ -57,16 +111,4 @@ def get_papers_for_run(db: Session, run_id: int) -> List[Dict[str, Any]]:
     stmt = select(Paper).join(RunPaper).where(RunPaper.run_id == run_id)
     papers = db.execute(stmt).scalars().all()
     
-    return [
-        {
-            "id": p.id,
-            "source": p.source,
-            "source_id": p.source_id,
-            "title": p.title,
-            "year": p.year,
-            "doi": p.doi,
-            "abstract": p.abstract,
-            "url": p.url,
-        }
-        for p in papers
-    ]
+    return [paper_to_dict(p) for p in papers]
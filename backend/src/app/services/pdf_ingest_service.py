@@ -0,0 +1,47 @@
+"""
+Uploaded PDF ingestion: parse stored uploads in a process pool.
+
+The pool is created lazily and shared by all requests of the API process,
+so at most PDF_PARSE_WORKERS PDFs are parsed at once however many arrive.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from src.app.core.metrics import PDF_PAGE_PARSE_SECONDS
+from src.app.core.settings import settings
+from src.app.tools.pdf_text import extract_pdf
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a process that runs an event loop and threads is unsafe
+                _pool = ProcessPoolExecutor(
+                    max_workers=max(1, settings.PDF_PARSE_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def parse_pdf(path: str) -> Dict[str, Any]:
+    """extract_pdf in the process pool, with per-page timings recorded."""
+    loop = asyncio.get_running_loop()
+    parsed = await loop.run_in_executor(get_pdf_pool(), extract_pdf, path)
+    for seconds in parsed["page_seconds"]:
+        PDF_PAGE_PARSE_SECONDS.observe(seconds)
+    return parsed
@@ -1,38 +1,55 @@
 import json
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from typing import Any, Dict, Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from src.app.core.settings import settings
 from src.app.db.models.retrieval_cache import RetrievalCache
 
 
+def normalize_topic(topic: str) -> str:
+    """Case- and whitespace-insensitive cache key for a topic."""
+    return " ".join(topic.split()).lower()
+
+
+def _canonical_params(query_params: Optional[Dict[str, Any]]) -> str:
+    if not query_params:
+        return ""
+    return json.dumps(query_params, sort_keys=True, separators=(",", ":"))
+
+
 def get_cached_payload(
     db: Session,
     topic: str,
     source: str = "openalex",
     ttl_hours: int = 24,
+    query_params: Optional[Dict[str, Any]] = None,
 ) -> Optional[Dict[str, Any]]:
+    """
+    Fresh payload for (topic, source, query_params), or None.
+    A hit bumps last_hit_at in the same statement (used for LRU eviction).
+    """
+    fresh_after = func.now() - timedelta(hours=ttl_hours)
     stmt = (
-        select(RetrievalCache)
-        .where(RetrievalCache.topic == topic, RetrievalCache.source == source)
-        .order_by(RetrievalCache.id.desc())
-        .limit(1)
+        update(RetrievalCache)
+        .where(
+            RetrievalCache.normalized_topic == normalize_topic(topic),
+            RetrievalCache.source == source,
+            RetrievalCache.query_params == _canonical_params(query_params),
+            RetrievalCache.created_at > fresh_after,
+        )
+        .values(hit_count=RetrievalCache.hit_count + 1, last_hit_at=func.now())
+        .returning(RetrievalCache.payload)
     )
-    row = db.execute(stmt).scalar_one_or_none()
-    if not row:
-        return None
-
-    # TTL check
-    created = row.created_at
-    if created.tzinfo is None:
-        created = created.replace(tzinfo=timezone.utc)
+    payload = db.execute(stmt).scalar_one_or_none()
+    db.commit()
 
-    if datetime.now(timezone.utc) - created > timedelta(hours=ttl_hours):
+    if payload is None:
         return None
-
-    return json.loads(row.payload)
+    return json.loads(payload)
 
 
 def save_payload(
@@ -40,11 +57,50 @@ def save_payload(
     topic: str,
     payload: Dict[str, Any],
     source: str = "openalex",
+    query_params: Optional[Dict[str, Any]] = None,
 ) -> None:
-    row = RetrievalCache(
+    """Insert the entry, or refresh the existing row for the same key in place."""
+    stmt = insert(RetrievalCache).values(
         topic=topic,
+        normalized_topic=normalize_topic(topic),
         source=source,
+        query_params=_canonical_params(query_params),
         payload=json.dumps(payload),
     )
-    db.add(row)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_retrieval_cache_key",
+        set_={
+            "payload": stmt.excluded.payload,
+            "created_at": func.now(),
+            "last_hit_at": None,
+        },
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def purge_expired(db: Session, ttl_hours: Optional[int] = None) -> int:
+    ttl_hours = ttl_hours if ttl_hours is not None else settings.RETRIEVAL_CACHE_TTL_HOURS
+    expired_before = func.now() - timedelta(hours=ttl_hours)
+    removed = db.execute(
+        delete(RetrievalCache).where(RetrievalCache.created_at < expired_before),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return removed
+
+
+def evict_least_recently_hit(db: Session, max_entries: Optional[int] = None) -> int:
+    """Keep at most max_entries rows, dropping those hit (or written) longest ago."""
+    max_entries = max_entries if max_entries is not None else settings.RETRIEVAL_CACHE_MAX_ENTRIES
+    keep = (
+        select(RetrievalCache.id)
+        .order_by(func.coalesce(RetrievalCache.last_hit_at, RetrievalCache.created_at).desc())
+        .limit(max_entries)
+    )
+    removed = db.execute(
+        delete(RetrievalCache).where(RetrievalCache.id.not_in(keep)),
+        execution_options={"synchronize_session": False},
+    ).rowcount
     db.commit()
+    return removed
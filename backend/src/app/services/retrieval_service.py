@@ -1,64 +1,105 @@
-import requests
-from typing import List, Dict, Any
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator
 from sqlalchemy.orm import Session
 
+from src.app.core.metrics import count_cache
+from src.app.core.settings import settings
+from src.app.tools.http_client import openalex_get
 from src.app.services.retrieval_cache_service import (
     get_cached_payload,
     save_payload,
 )
 
+OPENALEX_WORKS_URL = "https://api.openalex.org/works"
 
-def _fetch_from_openalex(topic: str, max_results: int = 10) -> List[Dict[str, Any]]:
-    url = "https://api.openalex.org/works"
+# OpenAlex only serves the first 10,000 results through page-number paging
+OPENALEX_MAX_PAGED_RESULTS = 10_000
+
+
+def _normalize_work(w: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "source": "openalex",
+        "source_id": w.get("id"),
+        "title": w.get("title"),
+        "year": w.get("publication_year"),
+        "doi": w.get("doi"),
+        "abstract": w.get("abstract"),
+        "url": w.get("id"),
+    }
+
+
+def _fetch_openalex_page(topic: str, page: int, per_page: int) -> List[Dict[str, Any]]:
     params = {
         "search": topic,
-        "per-page": max_results,
+        "per-page": per_page,
+        "page": page,
     }
 
-    resp = requests.get(url, params=params, timeout=20)
-    resp.raise_for_status()
-    data = resp.json()
-
-    papers = []
-    for w in data.get("results", []):
-        papers.append({
-            "source": "openalex",
-            "source_id": w.get("id"),
-            "title": w.get("title"),
-            "year": w.get("publication_year"),
-            "doi": w.get("doi"),
-            "abstract": w.get("abstract"),
-            "url": w.get("id"),
-        })
+    data = openalex_get(OPENALEX_WORKS_URL, params)
 
-    return papers
+    return [_normalize_work(w) for w in data.get("results", [])]
 
 
-def retrieve_papers_for_topic(
+def iter_paper_pages(
     db: Session,
     topic: str,
     max_results: int = 10,
-) -> List[Dict[str, Any]]:
-
-    cached = get_cached_payload(
-        db=db,
-        topic=topic,
-        source="openalex",
-        ttl_hours=24,
-    )
-
-    if cached and "papers" in cached:
-        print("OpenAlex cache HIT")
-        return cached["papers"][:max_results]
-
-    print("OpenAlex cache MISS → fetching")
-    papers = _fetch_from_openalex(topic, max_results=max_results)
-
-    save_payload(
-        db=db,
-        topic=topic,
-        payload={"papers": papers},
-        source="openalex",
-    )
-
-    return papers
+    per_page: int | None = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield normalized papers page by page, up to max_results in total.
+
+    Every page is cached on its own (keyed by per_page/page), so a larger
+    request reuses the pages an earlier, smaller one already fetched and
+    only downloads the rest. Missing pages are fetched concurrently;
+    pages are yielded in order as soon as each one is available.
+    """
+    per_page = per_page or settings.OPENALEX_PER_PAGE
+    max_results = min(max_results, OPENALEX_MAX_PAGED_RESULTS)
+    if max_results <= 0:
+        return
+
+    page_count = math.ceil(max_results / per_page)
+
+    cached: Dict[int, List[Dict[str, Any]]] = {}
+    for page in range(1, page_count + 1):
+        hit = get_cached_payload(
+            db=db,
+            topic=topic,
+            source="openalex",
+            ttl_hours=settings.RETRIEVAL_CACHE_TTL_HOURS,
+            query_params={"per_page": per_page, "page": page},
+        )
+        if hit and "papers" in hit:
+            cached[page] = hit["papers"]
+
+    missing = [page for page in range(1, page_count + 1) if page not in cached]
+    count_cache("retrieval", hits=len(cached), misses=len(missing))
+
+    remaining = max_results
+    with ThreadPoolExecutor(max_workers=max(1, min(settings.OPENALEX_PAGE_CONCURRENCY, len(missing)))) as pool:
+        futures = {page: pool.submit(_fetch_openalex_page, topic, page, per_page) for page in missing}
+
+        for page in range(1, page_count + 1):
+            if page in cached:
+                papers = cached[page]
+            else:
+                papers = futures[page].result()
+                save_payload(
+                    db=db,
+                    topic=topic,
+                    payload={"papers": papers},
+                    source="openalex",
+                    query_params={"per_page": per_page, "page": page},
+                )
+
+            if papers:
+                yield papers[:remaining]
+                remaining -= min(len(papers), remaining)
+
+            # a short page means the result set is exhausted
+            if remaining <= 0 or len(papers) < per_page:
+                for fut in futures.values():
+                    fut.cancel()
+                return
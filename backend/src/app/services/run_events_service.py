@@ -0,0 +1,116 @@
+"""
+Run progress events.
+
+Workers publish with Postgres NOTIFY, so any API process can pick the events
+up. Each API process keeps a single LISTEN connection and fans events out to
+its SSE subscribers via in-memory queues.
+"""
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import psycopg
+from sqlalchemy import text
+
+from src.app.db.session import engine, libpq_url
+
+logger = logging.getLogger(__name__)
+
+RUN_EVENTS_CHANNEL = "run_events"
+
+# NOTIFY payloads must stay below 8000 bytes
+_MAX_PAYLOAD_BYTES = 7900
+
+# how long subscribe() waits for the LISTEN connection before giving up on it
+_LISTEN_READY_TIMEOUT = 5
+# how often an idle listener checks whether anyone is still subscribed
+_LISTEN_IDLE_CHECK_SECONDS = 5
+
+
+def publish_run_event(run_id: int, event: str, **data: Any) -> None:
+    """
+    Best-effort: a lost progress event must never fail a run, so errors are
+    logged and swallowed. Uses its own autocommit connection so the event is
+    delivered immediately, not when the caller's transaction commits.
+    """
+    payload = json.dumps({"run_id": run_id, "event": event, "data": data, "ts": time.time()}, default=str)
+    if len(payload.encode("utf-8")) > _MAX_PAYLOAD_BYTES:
+        # drop long text fields; subscribers can fetch the full content
+        small = {k: v for k, v in data.items() if not isinstance(v, str) or len(v) <= 200}
+        payload = json.dumps({"run_id": run_id, "event": event, "data": {**small, "truncated": True}, "ts": time.time()}, default=str)
+
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": RUN_EVENTS_CHANNEL, "payload": payload})
+    except Exception:
+        logger.exception("failed to publish %s event for run %s", event, run_id)
+
+
+class RunEventBroadcaster:
+    """One LISTEN connection per API process, fanned out to per-run subscriber queues."""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # set while LISTEN is active; cleared whenever the connection is lost
+        self._listening = asyncio.Event()
+
+    def _ensure_listening(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def _listen_forever(self) -> None:
+        while self._subscribers:
+            try:
+                async with await psycopg.AsyncConnection.connect(libpq_url(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {RUN_EVENTS_CHANNEL}")
+                    self._listening.set()
+                    # release the connection soon after the last subscriber leaves
+                    while self._subscribers:
+                        async for notify in conn.notifies(timeout=_LISTEN_IDLE_CHECK_SECONDS):
+                            self._dispatch(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("run event listener failed, reconnecting")
+                self._listening.clear()
+                await asyncio.sleep(1)
+            finally:
+                self._listening.clear()
+
+    def _dispatch(self, raw: str) -> None:
+        try:
+            event = json.loads(raw)
+        except ValueError:
+            return
+        for queue in list(self._subscribers.get(event.get("run_id"), ())):
+            queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, run_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Yields once LISTEN is active, so events published after that point
+        reach the queue. Events published while the listener reconnects are
+        lost; callers should re-check the run status now and then.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(run_id, set()).add(queue)
+        try:
+            self._ensure_listening()
+            try:
+                await asyncio.wait_for(self._listening.wait(), timeout=_LISTEN_READY_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("run event listener not ready, subscribing to run %s anyway", run_id)
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(run_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[run_id]
+
+
+broadcaster = RunEventBroadcaster()
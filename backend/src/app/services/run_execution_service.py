@@ -1,48 +1,155 @@
+import logging
+from typing import Any, Dict, List
+
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from src.app.db.models.run import Run
 from src.app.core.enums import RunStatus
-from src.app.graph.lit_review_graph import build_lit_review_graph
-from src.app.services.artifact_service import save_artifact
+from src.app.graph.checkpointer import get_checkpointer, run_thread_id
+from src.app.graph.lit_review_graph import build_lit_review_graph, instrumented_nodes
+from src.app.services.artifact_service import upsert_artifact
 from src.app.services.paper_service import get_papers_for_run
+from src.app.services.run_events_service import publish_run_event
+from src.app.tools.openai_governor import BULK, openai_lane
+
+logger = logging.getLogger(__name__)
+
+
+def _mark_running(db: Session, runs: List[Run]) -> None:
+    for run in runs:
+        run.status = RunStatus.RUNNING.value
+    db.commit()
+    for run in runs:
+        publish_run_event(run.id, "run_status", status=run.status)
+
+
+def _complete(db: Session, run: Run, final_state: Dict[str, Any]) -> None:
+    # Save artifacts (so you can view results)
+    for kind in ("synthesis", "gaps", "hypotheses"):
+        if final_state.get(kind):
+            # replaces any partial content written while synthesis streamed
+            artifact = upsert_artifact(db, run.id, kind, final_state[kind])
+            publish_run_event(run.id, "artifact_ready", kind=kind, artifact_id=artifact.id)
+
+    run.status = RunStatus.COMPLETED.value
+    run.finished_at = func.now()
+    db.commit()
+    publish_run_event(run.id, "run_status", status=RunStatus.COMPLETED.value)
+
+
+def _fail(db: Session, run: Run, error: Exception) -> None:
+    db.rollback()
+    run.status = RunStatus.FAILED.value
+    run.finished_at = func.now()
+    db.commit()
+    publish_run_event(run.id, "run_status", status=RunStatus.FAILED.value, error=str(error)[:500])
 
 
 def execute_run(db: Session, run: Run):
     try:
         # 1. mark running
-        run.status = RunStatus.RUNNING.value
-        db.commit()
-
-        # 2. agent pipeline execution
-        graph = build_lit_review_graph()
-
-        # Get papers if they were uploaded with this run
-        papers = []
-        if run.upload_papers:
-            papers = get_papers_for_run(db, run.id)
-
-        initial_state = {
-            "run_id": run.id,
-            "topic": run.topic,
-            "upload_papers": run.upload_papers,
-            "papers": papers,
-            "db": db
-        }
-        final_state = graph.invoke(initial_state)
-
-        # Save artifacts (so you can view results)
-        if final_state.get("synthesis"):
-            save_artifact(db, run.id, "synthesis", final_state["synthesis"])
-        if final_state.get("gaps"):
-            save_artifact(db, run.id, "gaps", final_state["gaps"])
-        if final_state.get("hypotheses"):
-            save_artifact(db, run.id, "hypotheses", final_state["hypotheses"])
-
-        # 3. mark completed
-        run.status = RunStatus.COMPLETED.value
-        db.commit()
+        _mark_running(db, [run])
+
+        # 2. agent pipeline execution, checkpointed after every node
+        checkpointer = get_checkpointer()
+        graph = build_lit_review_graph(checkpointer=checkpointer)
+        thread_id = run_thread_id(run.id)
+        config = {"configurable": {"thread_id": thread_id, "db": db}}
+
+        pending = graph.get_state(config).next
+        if pending:
+            # an earlier attempt stopped mid-graph: continue from the node that failed
+            publish_run_event(run.id, "run_resumed", node=pending[0])
+            final_state = graph.invoke(None, config)
+        else:
+            # Get papers if they were uploaded with this run
+            papers = []
+            if run.upload_papers:
+                papers = get_papers_for_run(db, run.id)
+
+            initial_state = {
+                "run_id": run.id,
+                "topic": run.topic,
+                "upload_papers": run.upload_papers,
+                "papers": papers,
+            }
+            final_state = graph.invoke(initial_state, config)
+
+        # 3. save artifacts and mark completed
+        _complete(db, run, final_state)
 
     except Exception as e:
-        db.rollback()
-        run.status = RunStatus.FAILED.value
-        db.commit()
+        _fail(db, run, e)
         raise e
+
+    # the artifacts hold the results now; a leftover checkpoint is harmless
+    try:
+        checkpointer.delete_thread(thread_id)
+    except Exception:
+        logger.exception("failed to delete checkpoint thread %s", thread_id)
+
+
+def execute_batch(db: Session, runs: List[Run]) -> None:
+    """
+    Execute runs submitted together with the work on shared papers done once:
+
+    1. retrieval and dedup per run (each run keeps its own paper links),
+    2. one extraction/embedding pass per distinct paper, recorded under the
+       first run that has it,
+    3. synthesis per run.
+
+    LLM extraction calls scale with the number of distinct papers rather than
+    with the sum over runs. A failing run does not stop the others; a failing
+    shared extraction fails every run still in progress.
+
+    Batches run in the bulk OpenAI lane, behind interactive runs.
+    """
+    with openai_lane(BULK):
+        _execute_batch(db, runs)
+
+
+def _execute_batch(db: Session, runs: List[Run]) -> None:
+    nodes = instrumented_nodes()
+    config = {"configurable": {"db": db}}
+    _mark_running(db, runs)
+
+    states: Dict[int, Dict[str, Any]] = {}
+    for run in runs:
+        try:
+            state = {"run_id": run.id, "topic": run.topic, "upload_papers": False, "papers": []}
+            state = nodes["retriever"](state, config)
+            states[run.id] = nodes["dedup"](state, config)
+        except Exception as e:
+            logger.exception("batch run %s failed during retrieval", run.id)
+            _fail(db, run, e)
+
+    live = [run for run in runs if run.id in states]
+    if not live:
+        return
+
+    # each distinct paper is extracted once, under the first run that has it;
+    # later runs holding the same paper reuse that extraction as a cache hit
+    owned: Dict[int, List[Dict[str, Any]]] = {run.id: [] for run in live}
+    seen = set()
+    for run in live:
+        for paper in states[run.id]["papers"]:
+            if paper["id"] not in seen:
+                seen.add(paper["id"])
+                owned[run.id].append(paper)
+
+    try:
+        for run in live:
+            if owned[run.id]:
+                nodes["extractor"]({"run_id": run.id, "papers": owned[run.id]}, config)
+    except Exception as e:
+        logger.exception("shared extraction failed for batch %s", live[0].batch_id)
+        for run in live:
+            _fail(db, run, e)
+        return
+
+    for run in live:
+        try:
+            _complete(db, run, nodes["synthesizer"](states[run.id], config))
+        except Exception as e:
+            logger.exception("batch run %s failed during synthesis", run.id)
+            _fail(db, run, e)
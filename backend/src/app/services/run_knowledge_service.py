@@ -1,28 +1,21 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+
+from src.app.core.settings import settings
+from src.app.db.models.embedding import Embedding
 from src.app.db.models.extraction import Extraction
 from src.app.db.models.paper import Paper
+from src.app.services.embedding_service import get_or_create_cached_vectors
+from src.app.services.paper_service import run_paper_ids
+from src.app.services.similarity_service import retrieve_chunks
+from src.app.tools.openai_client import embed_model, estimate_tokens
 
 
-def build_run_evidence(db: Session, run_id: int, max_items: int = 12) -> str:
-    """
-    Build a compact evidence text from DB (papers + extractions)
-    that we can feed to an LLM for synthesis/gaps/hypotheses.
-
-    We keep it short to control token usage.
-    """
-    q = (
-        db.query(Extraction, Paper)
-        .join(Paper, Paper.id == Extraction.paper_id)
-        .filter(Extraction.run_id == run_id)
-        .order_by(Extraction.id.desc())
-        .limit(max_items)
-    )
-
-    blocks = []
-    for ex, paper in q.all():
-        d = ex.data or {}
-        blocks.append(
-            f"""PAPER: {paper.title or "unknown"} ({paper.year or "unknown"})
+def _evidence_block(paper: Paper, d: Dict) -> str:
+    return f"""PAPER: {paper.title or "unknown"} ({paper.year or "unknown"})
             DOI: {paper.doi or "unknown"}
             URL: {paper.url or "unknown"}
             PROBLEM: {d.get("problem", "unknown")}
@@ -31,6 +24,117 @@ def build_run_evidence(db: Session, run_id: int, max_items: int = 12) -> str:
             KEY RESULTS: {d.get("key_results", "unknown")}
             LIMITATIONS: {d.get("limitations", "unknown")}
             ---"""
-                    )
 
-    return "\n".join(blocks)
+
+def _run_paper_evidence(db: Session, run_id: int) -> List[Tuple[Paper, Dict, Optional[np.ndarray]]]:
+    """
+    (paper, latest extraction data, abstract embedding or None) for every
+    paper of the run (see paper_service.run_paper_ids).
+    """
+    latest = (
+        select(Extraction)
+        .where(Extraction.paper_id.in_(run_paper_ids(run_id)))
+        .distinct(Extraction.paper_id)
+        .order_by(Extraction.paper_id, Extraction.id.desc())
+        .subquery()
+    )
+
+    stmt = (
+        select(Paper, latest.c.data, Embedding.vector)
+        .join(latest, latest.c.paper_id == Paper.id)
+        .outerjoin(
+            Embedding,
+            (Embedding.paper_id == Paper.id)
+            & (Embedding.kind == "paper_abstract")
+            & (Embedding.model == embed_model()),
+        )
+        .order_by(latest.c.id.desc())
+    )
+
+    seen = set()
+    rows = []
+    for paper, data, vector in db.execute(stmt).all():
+        if paper.id in seen:
+            continue
+        seen.add(paper.id)
+        rows.append((paper, data or {}, None if vector is None else np.asarray(vector, dtype=np.float32)))
+    return rows
+
+
+def mmr_order(query: np.ndarray, vectors: np.ndarray, lambda_: float) -> List[int]:
+    """
+    Maximal marginal relevance ordering of `vectors` for `query`:
+    each pick maximises lambda * relevance - (1 - lambda) * redundancy,
+    where redundancy is the max cosine similarity to anything already picked.
+    """
+    n = len(vectors)
+    if n == 0:
+        return []
+
+    def _unit(m: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(m, axis=-1, keepdims=True)
+        return m / np.where(norms == 0, 1, norms)
+
+    v = _unit(vectors)
+    relevance = v @ _unit(query)
+    pairwise = v @ v.T
+
+    order: List[int] = []
+    redundancy = np.full(n, -np.inf)
+    remaining = np.ones(n, dtype=bool)
+
+    for _ in range(n):
+        score = relevance if not order else lambda_ * relevance - (1 - lambda_) * redundancy
+        score = np.where(remaining, score, -np.inf)
+        pick = int(np.argmax(score))
+        order.append(pick)
+        remaining[pick] = False
+        redundancy = np.maximum(redundancy, pairwise[:, pick])
+
+    return order
+
+
+def select_run_evidence(db: Session, run_id: int, topic: str) -> List[str]:
+    """
+    Evidence blocks for the run ranked by MMR against the topic embedding.
+    Papers without an embedding go last, newest extraction first.
+    """
+    rows = _run_paper_evidence(db, run_id)
+    with_vec = [r for r in rows if r[2] is not None]
+    without_vec = [r for r in rows if r[2] is None]
+
+    ranked = with_vec
+    # repeated topics reuse the cached query vector
+    entry = get_or_create_cached_vectors(db, [topic])[0] if with_vec else None
+    if entry is not None:
+        db.commit()
+        query = np.asarray(entry.vector, dtype=np.float32)
+        order = mmr_order(query, np.stack([r[2] for r in with_vec]), settings.EVIDENCE_MMR_LAMBDA)
+        ranked = [with_vec[i] for i in order]
+
+    return [_evidence_block(paper, data) for paper, data, _ in ranked + without_vec]
+
+
+def select_run_passages(db: Session, run_id: int, topic: str, k: Optional[int] = None) -> List[str]:
+    """Evidence blocks for the k full-text passages of the run closest to the topic."""
+    k = settings.EVIDENCE_CHUNKS_K if k is None else k
+    if k <= 0:
+        return []
+    return [
+        f"""PASSAGE from {c["title"] or "unknown"} (part {c["chunk_index"] + 1}):
+            {c["content"]}
+            ---"""
+        for c in retrieve_chunks(db, run_id, topic, k)
+    ]
+
+
+def fill_token_budget(blocks: List[str], token_budget: int) -> List[str]:
+    """Take blocks in order while they fit; skip (not stop at) ones that don't."""
+    chosen, used = [], 0
+    for block in blocks:
+        tokens = estimate_tokens(block)
+        if used + tokens > token_budget:
+            continue
+        chosen.append(block)
+        used += tokens
+    return chosen
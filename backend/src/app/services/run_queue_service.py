@@ -0,0 +1,149 @@
+from datetime import timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.app.core.enums import RunStatus
+from src.app.core.settings import settings
+from src.app.db.models.run import Run
+from src.app.services.run_events_service import publish_run_event
+
+
+def enqueue_runs(db: Session, runs: List[Run]) -> List[Run]:
+    """Queue several runs in one commit (see enqueue_run)."""
+    for run in runs:
+        run.status = RunStatus.QUEUED.value
+        run.worker_id = None
+        run.heartbeat_at = None
+    db.commit()
+    for run in runs:
+        db.refresh(run)
+        publish_run_event(run.id, "run_status", status=run.status)
+    return runs
+
+
+def enqueue_run(db: Session, run: Run) -> Run:
+    """
+    Hand a run over to the worker pool.
+    The API only flips the status; a worker picks it up from Postgres.
+    """
+    run.status = RunStatus.QUEUED.value
+    run.worker_id = None
+    run.heartbeat_at = None
+    db.commit()
+    db.refresh(run)
+    publish_run_event(run.id, "run_status", status=run.status)
+    return run
+
+
+def resume_run(db: Session, run: Run) -> Run:
+    """
+    Queue a failed run again. The worker picks up its checkpoint and
+    continues from the node that failed; attempts start over.
+    """
+    run.attempts = 0
+    run.finished_at = None
+    return enqueue_run(db, run)
+
+
+def claim_next_run(db: Session, worker_id: str) -> Optional[Run]:
+    """
+    Claim the oldest queued run, or a running run whose worker stopped
+    heart-beating, using SELECT ... FOR UPDATE SKIP LOCKED so that
+    concurrent workers never grab the same row.
+
+    Returns None when there is nothing to do.
+    """
+    while True:
+        stmt = (
+            select(Run)
+            .where(_claimable())
+            .order_by(Run.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        run = db.execute(stmt).scalar_one_or_none()
+        if not run:
+            db.rollback()
+            return None
+
+        # A run that keeps killing its worker should not be retried forever
+        if run.attempts >= settings.WORKER_MAX_ATTEMPTS:
+            run.status = RunStatus.FAILED.value
+            run.worker_id = None
+            run.finished_at = func.now()
+            db.commit()
+            publish_run_event(run.id, "run_status", status=RunStatus.FAILED.value, error="worker attempts exhausted")
+            continue
+
+        _mark_claimed(run, worker_id)
+        db.commit()
+        db.refresh(run)
+        return run
+
+
+def claim_batch_runs(db: Session, batch_id: str, worker_id: str) -> List[Run]:
+    """
+    Claim every other claimable run of a batch, so the worker holding one of
+    them can execute the batch together (see execute_batch). Runs locked by
+    another worker, or out of attempts, are left alone.
+    """
+    stmt = (
+        select(Run)
+        .where(
+            Run.batch_id == batch_id,
+            Run.attempts < settings.WORKER_MAX_ATTEMPTS,
+            _claimable(),
+        )
+        .order_by(Run.id)
+        .with_for_update(skip_locked=True)
+    )
+    runs = list(db.execute(stmt).scalars().all())
+    for run in runs:
+        _mark_claimed(run, worker_id)
+    db.commit()
+    for run in runs:
+        db.refresh(run)
+    return runs
+
+
+def _claimable():
+    """Queued, or running on a worker that stopped heart-beating."""
+    stale_before = func.now() - timedelta(seconds=settings.WORKER_STALE_AFTER_SECONDS)
+    return or_(
+        Run.status == RunStatus.QUEUED.value,
+        and_(
+            Run.status == RunStatus.RUNNING.value,
+            Run.heartbeat_at.is_not(None),
+            Run.heartbeat_at < stale_before,
+        ),
+    )
+
+
+def _mark_claimed(run: Run, worker_id: str) -> None:
+    run.status = RunStatus.RUNNING.value
+    run.worker_id = worker_id
+    run.heartbeat_at = func.now()
+    run.started_at = func.now()
+    run.attempts = run.attempts + 1
+
+
+def heartbeat_runs(db: Session, run_ids: Iterable[int], worker_id: str) -> int:
+    """Refresh heartbeat_at for the runs this worker is still executing."""
+    run_ids = list(run_ids)
+    if not run_ids:
+        return 0
+
+    stmt = (
+        update(Run)
+        .where(
+            Run.id.in_(run_ids),
+            Run.worker_id == worker_id,
+            Run.status == RunStatus.RUNNING.value,
+        )
+        .values(heartbeat_at=func.now())
+    )
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
@@ -1,6 +1,9 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.app.db.models.run import Run
-from src.app.schemas.run import RunCreate
+from src.app.schemas.run import RunBatchCreate, RunCreate
+import uuid
 
 def create_run(db= Session, payload= RunCreate) -> Run:
     run = Run(
@@ -14,5 +17,30 @@ def create_run(db= Session, payload= RunCreate) -> Run:
     db.refresh(run)
     return run
 
+def create_run_batch(db: Session, payload: RunBatchCreate) -> list[Run]:
+    """One retrieval run per topic, all sharing a new batch_id"""
+    batch_id = str(uuid.uuid4())
+    runs = [
+        Run(topic=topic, notes=payload.notes, upload_papers=False, status="created", batch_id=batch_id)
+        for topic in payload.topics
+    ]
+    db.add_all(runs)
+    db.commit()
+    return runs
+
 def list_runs(db: Session) -> list[Run]:
-    return db.query(Run).all()
\ No newline at end of file
+    return db.query(Run).all()
+
+
+async def list_runs_async(db: AsyncSession) -> list[Run]:
+    result = await db.execute(select(Run))
+    return list(result.scalars().all())
+
+
+async def get_run_async(db: AsyncSession, run_id: int) -> Run | None:
+    return await db.get(Run, run_id)
+
+
+async def count_runs_by_status_async(db: AsyncSession) -> dict[str, int]:
+    result = await db.execute(select(Run.status, func.count()).group_by(Run.status))
+    return {status: count for status, count in result.all()}
@@ -0,0 +1,224 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import Select, cast, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.app.core.settings import settings
+from src.app.db.models.embedding import EMBEDDING_DIMENSIONS, Embedding
+from src.app.db.models.paper import Paper
+from src.app.services.embedding_service import get_or_create_cached_vectors
+from src.app.services.paper_service import paper_to_dict, run_paper_ids
+from src.app.tools.openai_client import embed_model
+
+
+# Inlined rather than bound, so the planner can always match the partial
+# HNSW index predicates, including on prepared (generic) plans
+PAPER_ABSTRACT_KIND = literal("paper_abstract", literal_execute=True)
+CHUNK_KIND = literal("chunk", literal_execute=True)
+
+
+def _set_ef_search_stmt(ef_search: Optional[int], candidates: int = 0) -> Select:
+    # HNSW returns at most ef_search rows, so it must cover the re-rank pool.
+    # Transaction-local, so pooled connections keep the server default
+    ef_search = max(ef_search or settings.HNSW_EF_SEARCH, candidates)
+    return select(func.set_config("hnsw.ef_search", str(ef_search), True))
+
+
+def _set_iterative_scan_stmt() -> Optional[Select]:
+    if not settings.HNSW_ITERATIVE_SCAN:
+        return None
+    return select(func.set_config("hnsw.iterative_scan", settings.HNSW_ITERATIVE_SCAN, True))
+
+
+def _candidate_count(k: int, mode: str) -> int:
+    return k if mode == "exact" else k * max(1, settings.VECTOR_RERANK_FACTOR)
+
+
+def _approx_distance(vector: Sequence[float], mode: str):
+    """Distance expression matching one of the compact expression indexes on embeddings."""
+    dims = EMBEDDING_DIMENSIONS
+    if mode == "halfvec":
+        query = cast(literal(list(vector), HALFVEC(dims)), HALFVEC(dims))
+        return cast(Embedding.vector, HALFVEC(dims)).cosine_distance(query)
+    if mode == "binary":
+        query = cast(literal(list(vector), Vector(dims)), Vector(dims))
+        return cast(func.binary_quantize(Embedding.vector), BIT(dims)).hamming_distance(
+            cast(func.binary_quantize(query), BIT(dims))
+        )
+    raise ValueError(f"unknown vector index mode: {mode}")
+
+
+def _similar_papers_stmt(
+    vector: Sequence[float],
+    k: int,
+    exclude_paper_ids: Sequence[int],
+    mode: Optional[str] = None,
+) -> Select:
+    """
+    Top-k (Paper, cosine distance). In "halfvec"/"binary" mode the compact
+    HNSW index yields k * VECTOR_RERANK_FACTOR candidates, which are then
+    ordered exactly on the full-precision vector.
+    """
+    mode = mode or settings.VECTOR_INDEX_MODE
+    filters = [Embedding.kind == PAPER_ABSTRACT_KIND, Embedding.model == embed_model()]
+    if exclude_paper_ids:
+        filters.append(Embedding.paper_id.not_in(list(exclude_paper_ids)))
+
+    if mode == "exact":
+        distance = Embedding.vector.cosine_distance(vector).label("distance")
+        return (
+            select(Paper, distance)
+            .join(Embedding, Embedding.paper_id == Paper.id)
+            .where(*filters)
+            .order_by(distance)
+            .limit(k)
+        )
+
+    candidates = (
+        select(Embedding.paper_id, Embedding.vector)
+        .where(*filters)
+        .order_by(_approx_distance(vector, mode))
+        .limit(_candidate_count(k, mode))
+        .subquery()
+    )
+    distance = candidates.c.vector.cosine_distance(vector).label("distance")
+    return (
+        select(Paper, distance)
+        .join(candidates, candidates.c.paper_id == Paper.id)
+        .order_by(distance)
+        .limit(k)
+    )
+
+
+def _to_results(rows) -> List[Dict[str, Any]]:
+    return [
+        {**paper_to_dict(paper), "similarity": 1.0 - float(distance)}
+        for paper, distance in rows
+    ]
+
+
+def find_similar_papers(
+    db: Session,
+    vector: Sequence[float],
+    k: int = 10,
+    ef_search: Optional[int] = None,
+    exclude_paper_ids: Sequence[int] = (),
+) -> List[Dict[str, Any]]:
+    """Top-k papers by cosine similarity of their abstract embedding."""
+    db.execute(_set_ef_search_stmt(ef_search, _candidate_count(k, settings.VECTOR_INDEX_MODE)))
+    rows = db.execute(_similar_papers_stmt(vector, k, exclude_paper_ids)).all()
+    return _to_results(rows)
+
+
+async def find_similar_papers_async(
+    db: AsyncSession,
+    vector: Sequence[float],
+    k: int = 10,
+    ef_search: Optional[int] = None,
+    exclude_paper_ids: Sequence[int] = (),
+) -> List[Dict[str, Any]]:
+    await db.execute(_set_ef_search_stmt(ef_search, _candidate_count(k, settings.VECTOR_INDEX_MODE)))
+    rows = (await db.execute(_similar_papers_stmt(vector, k, exclude_paper_ids))).all()
+    return _to_results(rows)
+
+
+async def get_paper_vector_async(db: AsyncSession, paper_id: int) -> Optional[List[float]]:
+    stmt = (
+        select(Embedding.vector)
+        .where(Embedding.kind == "paper_abstract", Embedding.paper_id == paper_id, Embedding.model == embed_model())
+        .limit(1)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+def retrieve_chunks(db: Session, run_id: int, query: str, k: int = 8) -> List[Dict[str, Any]]:
+    """
+    The k full-text chunks of the run's papers closest to `query`: halfvec
+    HNSW candidates over kind='chunk', re-ranked on the full vector. The run
+    filter is applied inside the index scan, so iterative scanning keeps
+    going until enough chunks of this run are found.
+    """
+    entry = get_or_create_cached_vectors(db, [query])[0]
+    if entry is None:
+        return []
+    # commit the cached query vector before the transaction-local settings below
+    db.commit()
+
+    candidates_n = _candidate_count(k, "halfvec")
+    db.execute(_set_ef_search_stmt(None, candidates_n))
+    iterative_scan = _set_iterative_scan_stmt()
+    if iterative_scan is not None:
+        db.execute(iterative_scan)
+
+    candidates = (
+        select(Embedding.paper_id, Embedding.chunk_index, Embedding.content, Embedding.vector)
+        .where(
+            Embedding.kind == CHUNK_KIND,
+            Embedding.model == embed_model(),
+            Embedding.paper_id.in_(run_paper_ids(run_id)),
+        )
+        .order_by(_approx_distance(entry.vector, "halfvec"))
+        .limit(candidates_n)
+        .subquery()
+    )
+    distance = candidates.c.vector.cosine_distance(entry.vector).label("distance")
+    stmt = (
+        select(candidates.c.paper_id, Paper.title, candidates.c.chunk_index, candidates.c.content, distance)
+        .join(Paper, Paper.id == candidates.c.paper_id)
+        .order_by(distance)
+        .limit(k)
+    )
+    return [
+        {
+            "paper_id": paper_id,
+            "title": title,
+            "chunk_index": chunk_index,
+            "content": content,
+            "similarity": 1.0 - float(d),
+        }
+        for paper_id, title, chunk_index, content, d in db.execute(stmt).all()
+    ]
+
+
+async def measure_recall_async(
+    db: AsyncSession,
+    k: int = 10,
+    sample_size: int = 20,
+    mode: Optional[str] = None,
+    ef_search: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    recall@k of the ANN path against an exact scan, over a random sample of
+    paper embeddings used as queries. Meant for tuning VECTOR_INDEX_MODE,
+    VECTOR_RERANK_FACTOR and ef_search; the exact side is a sequential scan.
+    """
+    mode = mode or settings.VECTOR_INDEX_MODE
+    sample = (
+        await db.execute(
+            select(Embedding.paper_id, Embedding.vector)
+            .where(Embedding.kind == PAPER_ABSTRACT_KIND, Embedding.model == embed_model())
+            .order_by(func.random())
+            .limit(sample_size)
+        )
+    ).all()
+
+    await db.execute(_set_ef_search_stmt(ef_search, _candidate_count(k, mode)))
+    recalls: List[float] = []
+    for paper_id, vector in sample:
+        exact = (await db.execute(_similar_papers_stmt(vector, k, [paper_id], mode="exact"))).all()
+        if not exact:
+            continue
+        approx = (await db.execute(_similar_papers_stmt(vector, k, [paper_id], mode=mode))).all()
+        expected = {paper.id for paper, _ in exact}
+        recalls.append(len(expected & {paper.id for paper, _ in approx}) / len(expected))
+
+    return {
+        "mode": mode,
+        "k": k,
+        "rerank_factor": settings.VECTOR_RERANK_FACTOR,
+        "samples": len(recalls),
+        "recall_at_k": sum(recalls) / len(recalls) if recalls else None,
+        "min_recall": min(recalls) if recalls else None,
+    }
@@ -0,0 +1,105 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from src.app.core.settings import settings
+from src.app.services.llm_cache_service import get_cached_response, make_cache_key, save_response
+from src.app.tools.openai_client import (
+    SUMMARY_PROMPT_VERSION,
+    SUMMARY_TEMPERATURE,
+    chat_model,
+    estimate_tokens,
+    summarize_evidence_batch,
+)
+
+
+def token_batches(blocks: List[str], batch_tokens: int) -> List[List[str]]:
+    """Consecutive groups of blocks, each within batch_tokens (an oversized block gets its own batch)."""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for block in blocks:
+        tokens = estimate_tokens(block)
+        if current and used + tokens > batch_tokens:
+            batches.append(current)
+            current, used = [], 0
+        current.append(block)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _summary_block(summary: Dict[str, Any]) -> str:
+    gaps = summary.get("gaps") or []
+    papers = summary.get("papers") or []
+    lines = [f"PARTIAL SUMMARY: {summary.get('summary', '')}"]
+    if papers:
+        lines.append("PAPERS: " + "; ".join(str(p) for p in papers))
+    if gaps:
+        lines.append("GAPS: " + "; ".join(str(g) for g in gaps))
+    lines.append("---")
+    return "\n".join(lines)
+
+
+def _map_level(db: Session, topic: str, batches: List[List[str]]) -> List[str]:
+    """
+    Summarize every batch, in parallel for cache misses. Cache reads/writes
+    stay on the calling thread; pool threads only talk to OpenAI.
+    """
+    model = chat_model()
+    evidences = ["\n".join(batch) for batch in batches]
+    keys = [
+        make_cache_key(
+            kind="summary",
+            model=model,
+            temperature=SUMMARY_TEMPERATURE,
+            prompt_version=SUMMARY_PROMPT_VERSION,
+            topic=topic.strip(),
+            evidence=evidence,
+        )
+        for evidence in evidences
+    ]
+    summaries: List[Any] = [get_cached_response(db, key) for key in keys]
+
+    with ThreadPoolExecutor(max_workers=max(1, settings.SYNTHESIS_MAP_CONCURRENCY)) as pool:
+        futures = {
+            # copy_context keeps the caller's OpenAI lane in the pool thread
+            i: pool.submit(contextvars.copy_context().run, summarize_evidence_batch, topic, evidences[i])
+            for i, summary in enumerate(summaries)
+            if summary is None
+        }
+        for i, fut in futures.items():
+            summaries[i] = fut.result()
+            save_response(db, keys[i], model, summaries[i])
+
+    return [_summary_block(s) for s in summaries]
+
+
+def reduce_evidence(db: Session, topic: str, blocks: List[str], token_budget: int) -> str:
+    """
+    Hierarchical map-reduce over evidence blocks: while the evidence does not
+    fit token_budget, group it into token-bounded batches and replace each
+    batch by its summary. Depth grows with log(len(blocks)); the result is
+    the evidence pack for the final review call.
+    """
+    level = blocks
+    while sum(estimate_tokens(b) for b in level) > token_budget and len(level) > 1:
+        batches = token_batches(level, settings.SYNTHESIS_BATCH_TOKENS)
+        if len(batches) == len(level) and len(level) > 1:
+            # every block fills a batch on its own; pair them so the level shrinks
+            batches = [level[i:i + 2] for i in range(0, len(level), 2)]
+        level = _map_level(db, topic, batches)
+
+    return "\n".join(level)
+
+
+def use_map_reduce(blocks: List[str], token_budget: int) -> bool:
+    mode = settings.SYNTHESIS_MODE
+    if mode == "map_reduce":
+        return True
+    if mode == "single":
+        return False
+    return sum(estimate_tokens(b) for b in blocks) > token_budget
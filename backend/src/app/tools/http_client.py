@@ -0,0 +1,129 @@
+"""
+Shared HTTP client for scholarly APIs (OpenAlex, ...).
+
+One pooled, keep-alive httpx client per process, with HTTP/2, jittered
+exponential backoff that honours Retry-After, and a token-bucket rate
+limiter shared by every caller in the process.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.app.core.metrics import OPENALEX_FETCH_SECONDS, observe
+from src.app.core.settings import settings
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity` (rate <= 0: unlimited)."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+_openalex_bucket = TokenBucket(
+    rate=settings.OPENALEX_RATE_PER_SECOND,
+    capacity=max(1.0, settings.OPENALEX_RATE_PER_SECOND),
+)
+
+
+def _user_agent() -> str:
+    if settings.OPENALEX_MAILTO:
+        return f"{settings.APP_NAME} (mailto:{settings.OPENALEX_MAILTO})"
+    return settings.APP_NAME
+
+
+def get_http_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    http2=True,
+                    timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS),
+                    limits=httpx.Limits(
+                        max_connections=settings.HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+                    ),
+                    headers={"User-Agent": _user_agent()},
+                )
+    return _client
+
+
+def _retry_after_seconds(resp: httpx.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(attempt: int) -> float:
+    # full jitter: uniform(0, base * 2^attempt), capped
+    ceiling = min(settings.HTTP_BACKOFF_MAX_SECONDS, settings.HTTP_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _get_json(url: str, params: Dict[str, Any], bucket: TokenBucket) -> Dict[str, Any]:
+    client = get_http_client()
+    attempt = 0
+    while True:
+        bucket.acquire()
+        try:
+            resp = client.get(url, params=params)
+        except httpx.TransportError:
+            if attempt >= settings.HTTP_MAX_RETRIES:
+                raise
+            time.sleep(_backoff_seconds(attempt))
+            attempt += 1
+            continue
+
+        if resp.status_code in RETRYABLE_STATUS and attempt < settings.HTTP_MAX_RETRIES:
+            delay = _retry_after_seconds(resp)
+            time.sleep(delay if delay is not None else _backoff_seconds(attempt))
+            attempt += 1
+            continue
+
+        resp.raise_for_status()
+        return resp.json()
+
+
+def openalex_get(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """GET an OpenAlex endpoint through the shared client (polite pool included)."""
+    params = dict(params)
+    if settings.OPENALEX_MAILTO:
+        params.setdefault("mailto", settings.OPENALEX_MAILTO)
+    with observe(OPENALEX_FETCH_SECONDS):
+        return _get_json(url, params, _openalex_bucket)
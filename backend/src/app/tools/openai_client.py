@@ -1,11 +1,53 @@
 import os
 import json
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List
 from openai import OpenAI
 
+from src.app.core.metrics import OPENAI_CALL_SECONDS, observe
+from src.app.core.settings import settings
+from src.app.db.models.embedding import EMBEDDING_DIMENSIONS
+from src.app.tools.openai_governor import admit
+
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# Embeddings endpoint limits (per request / per input)
+EMBED_MAX_INPUTS_PER_REQUEST = int(os.getenv("OPENAI_EMBED_MAX_INPUTS", "2048"))
+EMBED_MAX_TOKENS_PER_REQUEST = int(os.getenv("OPENAI_EMBED_MAX_TOKENS", "300000"))
+EMBED_MAX_TOKENS_PER_INPUT = 8191
+
+# Bump whenever the review prompt changes so cached responses are not reused
+REVIEW_PROMPT_VERSION = "review-v1"
+REVIEW_TEMPERATURE = 0.3
+SUMMARY_PROMPT_VERSION = "summary-v1"
+SUMMARY_TEMPERATURE = 0.2
+
+# Expected completion sizes, charged to the governor up front and settled
+# against the reported usage afterwards
+EXTRACT_OUTPUT_TOKENS = 400
+REVIEW_OUTPUT_TOKENS = 2000
+SUMMARY_OUTPUT_TOKENS = 1000
+
+
+def chat_model() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+
+
+def embed_model() -> str:
+    return settings.OPENAI_EMBED_MODEL
+
+
+def embed_dimensions() -> int:
+    return EMBEDDING_DIMENSIONS
+
+
+def _embed_kwargs() -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"model": embed_model()}
+    # only the text-embedding-3 family accepts a dimensions override
+    if embed_model().startswith("text-embedding-3"):
+        kwargs["dimensions"] = embed_dimensions()
+    return kwargs
+
 
 def _strip_code_fences(s: str) -> str:
     # removes ```json ... ``` or ``` ... ```
@@ -14,10 +56,62 @@ def _strip_code_fences(s: str) -> str:
     s = re.sub(r"\s*```$", "", s)
     return s.strip()
 
-def embed_text(text: str) -> list[float]:
-    model = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
-    resp = client.embeddings.create(model=model, input=text)
-    return resp.data[0].embedding
+def estimate_tokens(text: str) -> int:
+    # ~3 chars per token errs on the safe side for English and code
+    return len(text) // 3 + 1
+
+
+def _messages_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+def _clip_for_embedding(text: str) -> str:
+    max_chars = EMBED_MAX_TOKENS_PER_INPUT * 3
+    return text[:max_chars] if len(text) > max_chars else text
+
+
+def _embedding_batches(texts: List[str]) -> List[List[int]]:
+    """
+    Group input indices into requests that stay under both the
+    input-count and the token limit of the embeddings endpoint.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (
+            len(current) >= EMBED_MAX_INPUTS_PER_REQUEST
+            or current_tokens + tokens > EMBED_MAX_TOKENS_PER_REQUEST
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def embed_texts(texts: List[str]) -> List[list[float]]:
+    """
+    Embed many texts with as few requests as the endpoint limits allow.
+    Returns vectors in the same order as `texts`.
+    """
+    clipped = [_clip_for_embedding(t) for t in texts]
+    vectors: List[list[float]] = [None] * len(clipped)  # type: ignore[list-item]
+
+    for batch in _embedding_batches(clipped):
+        batch_tokens = sum(estimate_tokens(clipped[i]) for i in batch)
+        with admit(batch_tokens) as ticket, observe(OPENAI_CALL_SECONDS, call="embed"):
+            resp = client.embeddings.create(input=[clipped[i] for i in batch], **_embed_kwargs())
+            ticket.settle(resp.usage)
+        for item in resp.data:
+            vectors[batch[item.index]] = item.embedding
+
+    return vectors
 
 def extract_paper_fields(title: str, abstract: str) -> Dict[str, Any]:
     model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
@@ -36,29 +130,26 @@ Title: {title}
 Abstract: {abstract}
 """.strip()
 
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": "You output strictly valid JSON only."},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.2,
-        response_format={"type": "json_object"},
-    )
+    messages = [
+        {"role": "system", "content": "You output strictly valid JSON only."},
+        {"role": "user", "content": prompt},
+    ]
+
+    with admit(_messages_tokens(messages) + EXTRACT_OUTPUT_TOKENS) as ticket, observe(OPENAI_CALL_SECONDS, call="extract"):
+        resp = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.2,
+            response_format={"type": "json_object"},
+        )
+        ticket.settle(resp.usage)
 
     text = resp.choices[0].message.content.strip()
     text = _strip_code_fences(text)
 
     return json.loads(text)
 
-def generate_review_outputs(topic: str, evidence: str) -> Dict[str, Any]:
-    """
-    Produce synthesis, gaps/contradictions, and hypotheses grounded in evidence.
-    Returns a JSON object with keys:
-    synthesis, gaps, hypotheses
-    """
-    model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
-
+def _review_messages(topic: str, evidence: str) -> List[Dict[str, str]]:
     prompt = f"""
     You are an academic research assistant.
 
@@ -83,14 +174,96 @@ def generate_review_outputs(topic: str, evidence: str) -> Dict[str, Any]:
     - Do NOT add "No clear contradictions found" anywhere. If none, contradictions must be [].
     """.strip()
 
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": "Return strictly valid JSON only."},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.3,
-        response_format={"type": "json_object"},
-    )
-
-    return json.loads(resp.choices[0].message.content)
\ No newline at end of file
+    return [
+        {"role": "system", "content": "Return strictly valid JSON only."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def generate_review_outputs(topic: str, evidence: str) -> Dict[str, Any]:
+    """
+    Produce synthesis, gaps/contradictions, and hypotheses grounded in evidence.
+    Returns a JSON object with keys:
+    synthesis, gaps, hypotheses
+    """
+    model = chat_model()
+    messages = _review_messages(topic, evidence)
+
+    with admit(_messages_tokens(messages) + REVIEW_OUTPUT_TOKENS) as ticket, observe(OPENAI_CALL_SECONDS, call="review"):
+        resp = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=REVIEW_TEMPERATURE,
+            response_format={"type": "json_object"},
+        )
+        ticket.settle(resp.usage)
+
+    return json.loads(resp.choices[0].message.content)
+
+
+def stream_review_outputs(topic: str, evidence: str) -> Iterator[str]:
+    """
+    Same request as generate_review_outputs, streamed: yields content
+    deltas of the JSON document as the model produces them.
+    """
+    model = chat_model()
+    messages = _review_messages(topic, evidence)
+
+    with admit(_messages_tokens(messages) + REVIEW_OUTPUT_TOKENS) as ticket, observe(OPENAI_CALL_SECONDS, call="review"):
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=REVIEW_TEMPERATURE,
+            response_format={"type": "json_object"},
+            stream=True,
+            # the last chunk then carries the usage for settling
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            if chunk.usage is not None:
+                ticket.settle(chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+def summarize_evidence_batch(topic: str, evidence: str) -> Dict[str, Any]:
+    """
+    Map step of hierarchical synthesis: condense one batch of evidence
+    (paper blocks or earlier summaries) into a short partial summary.
+    Returns a JSON object with keys: summary, gaps, papers
+    """
+    model = chat_model()
+
+    prompt = f"""
+    You are an academic research assistant condensing part of a literature review.
+
+    TOPIC: {topic}
+
+    EVIDENCE (paper entries or partial summaries of paper groups):
+    {evidence}
+
+    Task:
+    Return ONLY valid JSON with keys:
+    1) summary: 6-10 lines grouping this evidence into themes/trends, with key methods and results.
+    2) gaps: array of open questions or contradictions visible in this evidence (may be []).
+    3) papers: array of the paper titles (short) the summary relies on.
+
+    Rules:
+    - Do NOT invent citations. Use only paper titles that appear in the evidence.
+    """.strip()
+
+    messages = [
+        {"role": "system", "content": "Return strictly valid JSON only."},
+        {"role": "user", "content": prompt},
+    ]
+
+    with admit(_messages_tokens(messages) + SUMMARY_OUTPUT_TOKENS) as ticket, observe(OPENAI_CALL_SECONDS, call="summarize"):
+        resp = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=SUMMARY_TEMPERATURE,
+            response_format={"type": "json_object"},
+        )
+        ticket.settle(resp.usage)
+
+    return json.loads(resp.choices[0].message.content)
@@ -0,0 +1,221 @@
+"""
+Admission control for OpenAI calls.
+
+Every call is admitted through two token buckets, requests per minute and
+tokens per minute, charged with an estimate up front and settled against
+the usage OpenAI reports afterwards. With OPENAI_GOVERNOR=postgres the
+buckets live in the rate_limit_buckets table, so all API and worker
+processes share one budget; "local" keeps them per process and "off"
+disables admission.
+
+Calls run in a lane. "interactive" (the default) may drain the buckets;
+"bulk" (batch runs, backfills) must leave OPENAI_BULK_RESERVE of each
+bucket untouched, so interactive work always has headroom.
+"""
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.app.core.metrics import OPENAI_ADMISSION_WAIT_SECONDS
+from src.app.core.settings import settings
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+RPM_BUCKET = "openai:rpm"
+TPM_BUCKET = "openai:tpm"
+
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("openai_lane", default=INTERACTIVE)
+
+# longest single sleep while waiting, so a refund elsewhere is noticed quickly
+_MAX_WAIT_SECONDS = 1.0
+
+
+@contextmanager
+def openai_lane(lane: str) -> Iterator[None]:
+    """Run the block's OpenAI calls in `lane`. Pool threads need contextvars.copy_context()."""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+def _bucket_specs() -> Dict[str, Tuple[float, float]]:
+    """{name: (capacity, refill per second)}"""
+    return {
+        RPM_BUCKET: (float(settings.OPENAI_RPM), settings.OPENAI_RPM / 60.0),
+        TPM_BUCKET: (float(settings.OPENAI_TPM), settings.OPENAI_TPM / 60.0),
+    }
+
+
+def _floor(capacity: float, lane: str) -> float:
+    return capacity * settings.OPENAI_BULK_RESERVE if lane == BULK else 0.0
+
+
+class _LocalBuckets:
+    """Per-process buckets."""
+
+    def __init__(self):
+        now = time.monotonic()
+        self._state = {name: [cap, now] for name, (cap, _) in _bucket_specs().items()}
+        self._lock = threading.Lock()
+
+    def _level(self, name: str, now: float) -> float:
+        capacity, refill = _bucket_specs()[name]
+        tokens, updated = self._state[name]
+        return min(capacity, tokens + (now - updated) * refill)
+
+    def try_take(self, costs: Dict[str, float], lane: str) -> float:
+        """Take all costs, or nothing; returns 0 on success, else seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            for name, cost in costs.items():
+                capacity, refill = _bucket_specs()[name]
+                missing = cost + _floor(capacity, lane) - self._level(name, now)
+                if missing > 0:
+                    wait = max(wait, missing / refill)
+            if wait > 0:
+                return wait
+            for name, cost in costs.items():
+                self._state[name] = [self._level(name, now) - cost, now]
+            return 0.0
+
+    def adjust(self, name: str, delta: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._state[name] = [self._level(name, now) + delta, now]
+
+
+class _PostgresBuckets:
+    """Buckets in rate_limit_buckets; rows are locked in name order, so takers never deadlock."""
+
+    def __init__(self):
+        # imported lazily so "off"/"local" never touch the DB
+        from src.app.db.models.rate_limit_bucket import RateLimitBucket
+        from src.app.db.session import engine
+
+        self.table = RateLimitBucket.__table__
+        self.engine = engine
+        specs = _bucket_specs()
+        stmt = insert(self.table).values([
+            {"name": name, "tokens": cap, "capacity": cap, "refill_per_second": refill}
+            for name, (cap, refill) in specs.items()
+        ])
+        # configured limits win; the current level is kept
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.table.c.name],
+            set_={"capacity": stmt.excluded.capacity, "refill_per_second": stmt.excluded.refill_per_second},
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+
+    def _level_expr(self):
+        t = self.table.c
+        elapsed = func.extract("epoch", func.clock_timestamp() - t.updated_at)
+        return func.least(t.capacity, t.tokens + elapsed * t.refill_per_second)
+
+    def try_take(self, costs: Dict[str, float], lane: str) -> float:
+        t = self.table.c
+        with self.engine.begin() as conn:
+            rows = conn.execute(
+                select(t.name, self._level_expr(), t.capacity, t.refill_per_second)
+                .where(t.name.in_(list(costs)))
+                .order_by(t.name)
+                .with_for_update()
+            ).all()
+
+            wait = 0.0
+            for name, level, capacity, refill in rows:
+                missing = costs[name] + _floor(capacity, lane) - level
+                if missing > 0:
+                    wait = max(wait, missing / refill)
+            if wait > 0:
+                return wait
+
+            for name, level, _, _ in rows:
+                conn.execute(
+                    update(self.table)
+                    .where(t.name == name)
+                    .values(tokens=level - costs[name], updated_at=func.clock_timestamp())
+                )
+            return 0.0
+
+    def adjust(self, name: str, delta: float) -> None:
+        t = self.table.c
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(self.table)
+                .where(t.name == name)
+                .values(tokens=self._level_expr() + delta, updated_at=func.clock_timestamp())
+            )
+
+
+class Admission:
+    """An admitted call; settle() corrects the token charge with the real usage."""
+
+    def __init__(self, buckets, charged_tokens: int):
+        self._buckets = buckets
+        self.charged_tokens = charged_tokens
+        self._settled = False
+
+    def settle(self, usage) -> None:
+        total = getattr(usage, "total_tokens", None) if usage is not None else None
+        if self._buckets is None or self._settled or total is None:
+            return
+        self._settled = True
+        delta = self.charged_tokens - total
+        if delta:
+            # refund an over-estimate, or charge the overshoot
+            self._buckets.adjust(TPM_BUCKET, delta)
+
+
+_buckets = None
+_buckets_lock = threading.Lock()
+_concurrency = threading.BoundedSemaphore(max(1, settings.OPENAI_MAX_CONCURRENT_CALLS))
+
+
+def _get_buckets():
+    global _buckets
+    if _buckets is None and settings.OPENAI_GOVERNOR != "off":
+        with _buckets_lock:
+            if _buckets is None:
+                _buckets = _PostgresBuckets() if settings.OPENAI_GOVERNOR == "postgres" else _LocalBuckets()
+    return _buckets
+
+
+def _wait_for(buckets, estimated_tokens: int, lane: str) -> int:
+    """Take the call's cost from the buckets, sleeping until it fits; returns the tokens charged."""
+    # a call larger than the lane's whole budget would wait forever; cap it
+    tokens = int(min(estimated_tokens, settings.OPENAI_TPM * (1 - settings.OPENAI_BULK_RESERVE)))
+    costs = {RPM_BUCKET: 1.0, TPM_BUCKET: float(tokens)}
+    while True:
+        wait = buckets.try_take(costs, lane)
+        if wait <= 0:
+            return tokens
+        # jitter so waiting processes do not retry in lockstep
+        time.sleep(min(_MAX_WAIT_SECONDS, wait) * random.uniform(0.5, 1.0))
+
+
+@contextmanager
+def admit(estimated_tokens: int, lane: Optional[str] = None) -> Iterator[Admission]:
+    """Block until the call fits the RPM/TPM budget of its lane, then hold a concurrency slot."""
+    lane = lane or current_lane()
+    buckets = _get_buckets()
+
+    start = time.perf_counter()
+    charged = _wait_for(buckets, estimated_tokens, lane) if buckets is not None else estimated_tokens
+    with _concurrency:
+        OPENAI_ADMISSION_WAIT_SECONDS.labels(lane=lane).observe(time.perf_counter() - start)
+        yield Admission(buckets, charged)
@@ -1,6 +1,6 @@
-import os
 from typing import List, Dict, Any
-import requests
+
+from src.app.tools.http_client import openalex_get
 
 
 OPENALEX_BASE_URL = "https://api.openalex.org/works"
@@ -24,14 +24,8 @@ def search_works_by_topic(topic: str, max_results: int = 10) -> List[Dict[str, A
         "per-page": max_results,
     }
 
-    # Optional: polite usage (you can add your email here)
-    mailto = os.getenv("OPENALEX_MAILTO")
-    if mailto:
-        params["mailto"] = mailto
-
-    resp = requests.get(OPENALEX_BASE_URL, params=params, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
+    # polite pool (OPENALEX_MAILTO), retries and rate limiting live in the shared client
+    data = openalex_get(OPENALEX_BASE_URL, params)
 
     results = []
     for item in data.get("results", []):
@@ -0,0 +1,82 @@
+"""
+PDF text extraction for uploaded papers.
+
+`extract_pdf` is a plain top-level function so it can run in a
+ProcessPoolExecutor: parsing is CPU-bound and must stay off the API's
+event loop (and out of its GIL).
+"""
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from pypdf import PdfReader
+
+# first body text of a paper usually starts at one of these headings
+_ABSTRACT_HEADING = re.compile(r"^\s*abstract\b[\s.:—-]*", re.IGNORECASE | re.MULTILINE)
+_ABSTRACT_END = re.compile(
+    r"^\s*(?:(?:1|I)\.?\s+)?(?:introduction|keywords|index terms|key words)\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+_MAX_ABSTRACT_CHARS = 3000
+_FALLBACK_ABSTRACT_CHARS = 1500
+
+
+def _clean(text: str) -> str:
+    # re-join words hyphenated across line breaks, squeeze blank runs
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _guess_title(reader: PdfReader, first_page: str) -> Optional[str]:
+    meta_title = (reader.metadata.title if reader.metadata else None) or ""
+    meta_title = meta_title.strip()
+    # producers often leave "untitled", a file name or a template name here
+    if 10 <= len(meta_title) <= 300 and not meta_title.lower().endswith((".pdf", ".doc", ".docx", ".tex")):
+        return meta_title
+
+    for line in first_page.splitlines():
+        line = line.strip()
+        if 10 <= len(line) <= 300 and not _ABSTRACT_HEADING.match(line):
+            return line
+    return None
+
+
+def _find_abstract(text: str) -> Optional[str]:
+    start = _ABSTRACT_HEADING.search(text)
+    if start:
+        rest = text[start.end():]
+        end = _ABSTRACT_END.search(rest)
+        abstract = rest[:end.start()] if end else rest[:_MAX_ABSTRACT_CHARS]
+        abstract = " ".join(abstract.split())
+        if abstract:
+            return abstract[:_MAX_ABSTRACT_CHARS]
+
+    # no heading: the opening of the document is the best summary available
+    opening = " ".join(text.split())
+    return opening[:_FALLBACK_ABSTRACT_CHARS] or None
+
+
+def extract_pdf(path: str) -> Dict[str, Any]:
+    """
+    Title, abstract and full text of the PDF at `path`, plus per-page timing.
+    Raises pypdf errors for unreadable files.
+    """
+    started = time.perf_counter()
+    reader = PdfReader(path)
+
+    pages: List[str] = []
+    page_seconds: List[float] = []
+    for page in reader.pages:
+        t0 = time.perf_counter()
+        pages.append(_clean(page.extract_text() or ""))
+        page_seconds.append(time.perf_counter() - t0)
+
+    full_text = "\n\n".join(p for p in pages if p)
+    return {
+        "title": _guess_title(reader, pages[0] if pages else ""),
+        "abstract": _find_abstract(full_text),
+        "full_text": full_text or None,
+        "pages": len(pages),
+        "page_seconds": page_seconds,
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,39 @@
+from typing import List
+
+# matches openai_client.estimate_tokens (~3 characters per token)
+_CHARS_PER_TOKEN = 3
+
+
+def split_into_chunks(text: str, chunk_tokens: int, overlap_tokens: int) -> List[str]:
+    """
+    Overlapping, word-aligned windows of at most ~chunk_tokens each; consecutive
+    chunks share ~overlap_tokens (at most half a chunk) so a passage cut at a
+    boundary survives whole in one of them. Whitespace is collapsed.
+    """
+    words = (text or "").split()
+    if not words:
+        return []
+
+    max_chars = max(1, chunk_tokens * _CHARS_PER_TOKEN)
+    # a larger overlap would advance the window a word at a time
+    overlap_chars = min(max(0, overlap_tokens * _CHARS_PER_TOKEN), max_chars // 2)
+
+    chunks: List[str] = []
+    start = 0
+    while start < len(words):
+        end, size = start, 0
+        # always take at least one word, even an oversized one
+        while end < len(words) and (end == start or size + len(words[end]) + 1 <= max_chars):
+            size += len(words[end]) + 1
+            end += 1
+        chunks.append(" ".join(words[start:end]))
+        if end >= len(words):
+            break
+
+        # step back over the overlap, but always make progress
+        back, kept = end, 0
+        while back > start + 1 and kept + len(words[back - 1]) + 1 <= overlap_chars:
+            back -= 1
+            kept += len(words[back]) + 1
+        start = back
+    return chunks
@@ -0,0 +1,17 @@
+import re
+from typing import Optional
+
+# "https://doi.org/", "http://dx.doi.org/", "doi:" ...
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """
+    Canonical DOI for matching: no resolver/"doi:" prefix, lowercased
+    (DOIs are case-insensitive). Returns None for empty input.
+    Mirrored in SQL by the migration that backfilled papers.doi_normalized.
+    """
+    if not doi:
+        return None
+    normalized = _DOI_PREFIX.sub("", doi.strip()).strip().lower()
+    return normalized or None
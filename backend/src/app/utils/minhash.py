@@ -0,0 +1,73 @@
+"""
+MinHash signatures and LSH banding for near-duplicate short texts (titles).
+
+Signatures estimate Jaccard similarity of character shingle sets; banding
+turns the all-pairs comparison into bucket lookups, so only likely
+duplicates are compared.
+"""
+import re
+import zlib
+from collections import defaultdict
+from typing import Iterable, List, Set, Tuple
+
+import numpy as np
+
+# prime just above 2**32; hashes are crc32 values (< 2**32)
+_PRIME = np.uint64(4294967311)
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def shingles(text: str, k: int = 4) -> Set[str]:
+    """Character k-grams of the lowercased, punctuation-free text."""
+    normalized = _NON_ALNUM.sub(" ", (text or "").lower()).strip()
+    if len(normalized) <= k:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # a < 2**31 keeps a * h + b inside uint64
+        self.a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, items: Set[str]) -> np.ndarray:
+        if not items:
+            # empty sets never match anything
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in items), dtype=np.uint64, count=len(items))
+        return ((np.outer(hashes, self.a) + self.b) % _PRIME).min(axis=0)
+
+
+def estimated_jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.mean(sig_a == sig_b))
+
+
+def lsh_candidate_pairs(signatures: List[np.ndarray], bands: int) -> Set[Tuple[int, int]]:
+    """
+    Index pairs (i < j) that share at least one band. With r = num_perm / bands
+    rows per band, pairs around Jaccard (1/bands) ** (1/r) and above are likely
+    to collide.
+    """
+    if not signatures:
+        return set()
+    rows = len(signatures[0]) // bands
+    pairs: Set[Tuple[int, int]] = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        for i, sig in enumerate(signatures):
+            if sig[0] == np.iinfo(np.uint64).max:
+                continue
+            buckets[sig[band * rows:(band + 1) * rows].tobytes()].append(i)
+        for members in buckets.values():
+            pairs.update(_pairs(members))
+    return pairs
+
+
+def _pairs(members: Iterable[int]) -> Iterable[Tuple[int, int]]:
+    members = sorted(members)
+    for x in range(len(members)):
+        for y in range(x + 1, len(members)):
+            yield members[x], members[y]
@@ -0,0 +1,60 @@
+import json
+from typing import Any, Dict, Optional
+
+
+def _close(text: str) -> str:
+    """Close any string, object or array left open at the end of `text`."""
+    stack = []
+    in_string = False
+    escaped = False
+
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        if escaped:
+            text = text[:-1]
+        text += '"'
+
+    return text.rstrip().rstrip(",") + "".join(reversed(stack))
+
+
+def parse_partial_json(text: str, max_attempts: int = 50) -> Optional[Dict[str, Any]]:
+    """
+    Best-effort parse of a JSON object that is still being streamed.
+
+    Closes whatever is open; if the tail is not parseable yet (dangling key,
+    half-written literal, ...) it backs off to the previous element boundary.
+    Returns None until at least the opening brace has arrived.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    candidate = text[start:]
+
+    for _ in range(max_attempts):
+        try:
+            value = json.loads(_close(candidate))
+            return value if isinstance(value, dict) else None
+        except ValueError:
+            pass
+
+        cut = max(candidate.rfind(","), candidate.rfind("{", 0, len(candidate) - 1), candidate.rfind("[", 0, len(candidate) - 1))
+        if cut <= 0:
+            return {}
+        # keep an opening bracket, drop a trailing comma
+        candidate = candidate[: cut + 1] if candidate[cut] in "{[" else candidate[:cut]
+
+    return None
@@ -0,0 +1,140 @@
+"""
+Run worker process.
+
+Claims queued runs from Postgres and executes the agent pipeline outside
+of the API process. Start as many of these as you need:
+
+    python -m src.app.worker
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+
+from prometheus_client import start_http_server
+
+from src.app.core.metrics import WORKER_RUNS_IN_FLIGHT
+from src.app.core.settings import settings
+from src.app.db.session import SessionLocal
+from src.app.services.run_execution_service import execute_batch, execute_run
+from src.app.services.llm_cache_service import evict_llm_cache
+from src.app.services.retrieval_cache_service import evict_least_recently_hit, purge_expired
+from src.app.services.run_queue_service import claim_batch_runs, claim_next_run, heartbeat_runs
+
+logger = logging.getLogger("src.app.worker")
+
+
+class RunWorker:
+    def __init__(self, concurrency: int | None = None):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.stop_event = threading.Event()
+        self._in_flight: set[int] = set()
+        self._lock = threading.Lock()
+
+    def _execute_loop(self) -> None:
+        while not self.stop_event.is_set():
+            db = SessionLocal()
+            try:
+                run = claim_next_run(db, self.worker_id)
+                if not run:
+                    self.stop_event.wait(settings.WORKER_POLL_INTERVAL_SECONDS)
+                    continue
+
+                # a batch run brings the rest of its batch along
+                runs = [run]
+                if run.batch_id:
+                    runs += claim_batch_runs(db, run.batch_id, self.worker_id)
+                run_ids = [r.id for r in runs]
+
+                with self._lock:
+                    self._in_flight.update(run_ids)
+                WORKER_RUNS_IN_FLIGHT.inc(len(runs))
+                logger.info("worker %s claimed runs %s", self.worker_id, run_ids)
+                try:
+                    if run.batch_id:
+                        execute_batch(db, runs)
+                        logger.info("batch %s finished", run.batch_id)
+                    else:
+                        execute_run(db, run)
+                        logger.info("run %s completed", run.id)
+                except Exception:
+                    logger.exception("runs %s failed", run_ids)
+                finally:
+                    with self._lock:
+                        self._in_flight.difference_update(run_ids)
+                    WORKER_RUNS_IN_FLIGHT.dec(len(runs))
+            except Exception:
+                # DB hiccup while claiming; back off and try again
+                logger.exception("worker loop error")
+                self.stop_event.wait(settings.WORKER_POLL_INTERVAL_SECONDS)
+            finally:
+                db.close()
+
+    def _heartbeat_loop(self) -> None:
+        while not self.stop_event.wait(settings.WORKER_HEARTBEAT_SECONDS):
+            with self._lock:
+                run_ids = list(self._in_flight)
+            if not run_ids:
+                continue
+            db = SessionLocal()
+            try:
+                heartbeat_runs(db, run_ids, self.worker_id)
+            except Exception:
+                logger.exception("heartbeat failed")
+            finally:
+                db.close()
+
+    def _maintenance_loop(self) -> None:
+        """Periodic cache eviction; cheap enough that every worker can do it."""
+        while not self.stop_event.wait(settings.CACHE_MAINTENANCE_INTERVAL_SECONDS):
+            db = SessionLocal()
+            try:
+                removed = evict_llm_cache(db)
+                if removed:
+                    logger.info("evicted %s llm cache entries", removed)
+                removed = purge_expired(db) + evict_least_recently_hit(db)
+                if removed:
+                    logger.info("evicted %s retrieval cache entries", removed)
+            except Exception:
+                logger.exception("cache maintenance failed")
+                db.rollback()
+            finally:
+                db.close()
+
+    def run_forever(self) -> None:
+        threads = [
+            threading.Thread(target=self._execute_loop, name=f"run-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        # The heartbeat must keep going while executors are busy, but must not
+        # keep the process alive on its own.
+        threads.append(threading.Thread(target=self._heartbeat_loop, name="run-heartbeat", daemon=True))
+        threads.append(threading.Thread(target=self._maintenance_loop, name="cache-maintenance", daemon=True))
+
+        for t in threads:
+            t.start()
+        logger.info("worker %s started with concurrency=%s", self.worker_id, self.concurrency)
+
+        for t in threads:
+            if not t.daemon:
+                t.join()
+
+    def stop(self, *_args) -> None:
+        logger.info("worker %s stopping after in-flight runs finish", self.worker_id)
+        self.stop_event.set()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if settings.WORKER_METRICS_PORT:
+        start_http_server(settings.WORKER_METRICS_PORT)
+    worker = RunWorker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
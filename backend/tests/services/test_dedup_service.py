@@ -0,0 +1,115 @@
+from sqlalchemy import select
+
+from src.app.db.models.paper_alias import PaperAlias
+from src.app.db.models.run import Run
+from src.app.services.dedup_service import _Groups, collapse_duplicates
+from src.app.services.paper_service import link_papers_to_run, run_paper_ids, upsert_papers
+
+
+def test_groups_root_at_smallest_id():
+    groups = _Groups()
+    groups.union(5, 3, "title", 0.9)
+    groups.union(3, 8, "doi")
+    groups.union(9, 8, "doi")
+    assert {groups.find(x) for x in (3, 5, 8, 9)} == {3}
+    assert groups.find(4) == 4
+
+
+def test_groups_keep_first_evidence():
+    groups = _Groups()
+    groups.union(2, 1, "doi")
+    groups.union(2, 1, "title", 0.9)
+    groups.union(3, 2, "title", 0.85)
+    assert groups.evidence == {2: ("doi", None), 3: ("title", 0.85)}
+    assert 1 not in groups.evidence
+
+
+def _run(db):
+    run = Run(topic="t", status="running")
+    db.add(run)
+    db.commit()
+    return run
+
+
+def _papers(db, run, rows):
+    papers = upsert_papers(db, [{"source": "openalex", **row} for row in rows])
+    link_papers_to_run(db, run.id, [p["id"] for p in papers])
+    return papers
+
+
+def _linked(db, run):
+    return set(db.execute(run_paper_ids(run.id)).scalars())
+
+
+def _aliases(db):
+    return {a.paper_id: (a.canonical_paper_id, a.reason) for a in db.execute(select(PaperAlias)).scalars()}
+
+
+def test_collapse_keeps_one_canonical_paper_per_group(db):
+    run = _run(db)
+    a, b, c, d = _papers(db, run, [
+        {"source_id": "W1", "title": "Attention Is All You Need", "doi": "10.1/ABC", "year": 2017},
+        {"source_id": "W2", "title": "A different title", "doi": "https://doi.org/10.1/abc", "year": 2017},
+        {"source_id": "W3", "title": "attention is all you need.", "year": 2017},
+        {"source_id": "W4", "title": "Deep Residual Learning for Image Recognition", "year": 2016},
+    ])
+
+    result = collapse_duplicates(db, run.id, [a, b, c, d])
+
+    assert [p["id"] for p in result] == [a["id"], d["id"]]
+    assert _linked(db, run) == {a["id"], d["id"]}
+    assert _aliases(db) == {b["id"]: (a["id"], "doi"), c["id"]: (a["id"], "title")}
+
+
+def test_later_runs_resolve_aliases_to_the_canonical_paper(db):
+    first = _run(db)
+    a, b = _papers(db, first, [
+        {"source_id": "W1", "title": "Paper one", "doi": "10.1/x"},
+        {"source_id": "W2", "title": "Paper one, again", "doi": "doi:10.1/X"},
+    ])
+    collapse_duplicates(db, first.id, [a, b])
+
+    # the alias alone comes back in another run
+    second = _run(db)
+    (b_again,) = _papers(db, second, [{"source_id": "W2", "title": "Paper one, again"}])
+    result = collapse_duplicates(db, second.id, [b_again])
+
+    assert [p["id"] for p in result] == [a["id"]]
+    assert _linked(db, second) == {a["id"]}
+    assert _aliases(db) == {b["id"]: (a["id"], "doi")}
+
+
+def test_group_joins_stored_canonical_paper(db):
+    # a is stored earlier (smallest id) but is not part of this run
+    (a,) = upsert_papers(db, [{"source": "crossref", "source_id": "A", "title": "Unrelated", "doi": "10.1/y"}])
+
+    run = _run(db)
+    b, c = _papers(db, run, [
+        {"source_id": "W2", "title": "Shared title of a paper", "doi": "10.1/Y"},
+        {"source_id": "W3", "title": "Shared title of a paper"},
+    ])
+    result = collapse_duplicates(db, run.id, [b, c])
+
+    assert [p["id"] for p in result] == [a["id"]]
+    assert _aliases(db) == {b["id"]: (a["id"], "doi"), c["id"]: (a["id"], "title")}
+    assert _linked(db, run) == {a["id"]}
+
+
+def test_alias_chains_stay_one_hop(db):
+    (a,) = upsert_papers(db, [{"source": "crossref", "source_id": "A", "title": "Unrelated", "doi": "10.1/q"}])
+
+    first = _run(db)
+    b, c = _papers(db, first, [
+        {"source_id": "W2", "title": "Shared title of a paper"},
+        {"source_id": "W3", "title": "Shared title of a paper"},
+    ])
+    collapse_duplicates(db, first.id, [b, c])
+    assert _aliases(db) == {c["id"]: (b["id"], "title")}
+
+    # b turns out to share a's DOI: b becomes an alias of a, and so does c
+    second = _run(db)
+    (b_again,) = _papers(db, second, [{"source_id": "W2", "title": "Shared title of a paper", "doi": "10.1/Q"}])
+    collapse_duplicates(db, second.id, [b_again])
+
+    assert _aliases(db) == {b["id"]: (a["id"], "doi"), c["id"]: (a["id"], "title")}
+    assert _linked(db, second) == {a["id"]}
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.app.services.run_knowledge_service import mmr_order
+
+
+def test_empty():
+    assert mmr_order(np.ones(2), np.empty((0, 2)), 0.5) == []
+
+
+@pytest.mark.parametrize(
+    "lambda_, expected",
+    [
+        # pure relevance: the near-duplicate of the best match comes second
+        (1.0, [0, 1, 2]),
+        # diversity kicks in: the orthogonal vector jumps ahead of the duplicate
+        (0.5, [0, 2, 1]),
+    ],
+)
+def test_relevance_vs_diversity(lambda_, expected):
+    query = np.array([1.0, 0.6])
+    vectors = np.array([
+        [1.0, 0.5],
+        [1.0, 0.45],
+        [0.2, 1.0],
+    ])
+    assert mmr_order(query, vectors, lambda_) == expected
+
+
+def test_is_a_permutation_and_ignores_scale():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(20, 8))
+    query = rng.normal(size=8)
+    order = mmr_order(query, vectors, 0.7)
+    assert sorted(order) == list(range(20))
+    assert mmr_order(query * 3, vectors * 5, 0.7) == order
+
+
+def test_zero_vectors_do_not_break_ordering():
+    vectors = np.array([[0.0, 0.0], [1.0, 0.0]])
+    assert mmr_order(np.array([1.0, 0.0]), vectors, 0.5) == [1, 0]
@@ -0,0 +1,70 @@
+import zlib
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from src.app.db.models.embedding import EMBEDDING_DIMENSIONS
+from src.app.db.models.extraction import Extraction
+from src.app.db.models.paper import Paper
+from src.app.db.models.run import Run
+from src.app.services import run_execution_service
+
+PAGES = {
+    "topic a": [("W1", "Shared paper"), ("W2", "Only in A")],
+    "topic b": [("W1", "Shared paper"), ("W3", "Only in B")],
+}
+
+
+def _vector(text):
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    return rng.normal(size=EMBEDDING_DIMENSIONS).tolist()
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Replace OpenAlex and OpenAI with deterministic fakes; returns the evidence each synthesis saw."""
+    def pages(db, topic, max_results):
+        yield [
+            {
+                "source": "openalex", "source_id": sid, "title": title,
+                "abstract": f"abstract of {title}", "full_text": f"full text of {title} " * 20,
+            }
+            for sid, title in PAGES[topic]
+        ]
+
+    seen = {}
+
+    def review(db, topic, evidence, produce=None):
+        seen[topic] = evidence
+        return {"synthesis": "s", "gaps": [], "hypotheses": []}
+
+    monkeypatch.setattr("src.app.agents.retriever.iter_paper_pages", pages)
+    monkeypatch.setattr("src.app.agents.extractor.extract_paper_fields", lambda title, abstract: {"problem": title})
+    monkeypatch.setattr("src.app.services.embedding_service.embed_texts", lambda texts: [_vector(t) for t in texts])
+    monkeypatch.setattr("src.app.agents.synthesizer.get_or_generate_review_outputs", review)
+    return seen
+
+
+def test_batch_runs_only_see_their_own_papers(db, offline):
+    runs = [Run(topic=topic, status="running", batch_id="b") for topic in PAGES]
+    db.add_all(runs)
+    db.commit()
+
+    run_execution_service._execute_batch(db, runs)
+
+    for run in runs:
+        db.refresh(run)
+        assert run.status == "completed"
+
+    a, b = offline["topic a"], offline["topic b"]
+    assert "Shared paper" in a and "Only in A" in a and "Only in B" not in a
+    assert "Shared paper" in b and "Only in B" in b and "Only in A" not in b
+    # passages (full-text chunks) respect the same boundary
+    assert "PASSAGE from Only in A" in a and "PASSAGE from Only in B" not in a
+    assert "PASSAGE from Only in B" in b and "PASSAGE from Only in A" not in b
+
+    # the shared paper is extracted once, under the first run
+    owners = dict(db.execute(select(Paper.source_id, Extraction.run_id).join(Extraction)).all())
+    assert db.query(Extraction).count() == 3
+    assert owners == {"W1": runs[0].id, "W2": runs[0].id, "W3": runs[1].id}
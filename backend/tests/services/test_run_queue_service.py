@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from src.app.core.enums import RunStatus
+from src.app.core.settings import settings
+from src.app.db.models.run import Run
+from src.app.db.session import SessionLocal
+from src.app.services.run_queue_service import claim_batch_runs, claim_next_run, heartbeat_runs
+
+
+def _run(db, status=RunStatus.QUEUED, batch_id=None, attempts=0, heartbeat_age=None, worker_id=None):
+    run = Run(topic="t", status=status.value, batch_id=batch_id, attempts=attempts, worker_id=worker_id)
+    if heartbeat_age is not None:
+        run.heartbeat_at = func.now() - timedelta(seconds=heartbeat_age)
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def test_claims_oldest_queued_run_once(db):
+    first = _run(db)
+    second = _run(db)
+    _run(db, status=RunStatus.CREATED)
+    _run(db, status=RunStatus.COMPLETED)
+
+    claimed = claim_next_run(db, "w1")
+    assert claimed.id == first.id
+    assert (claimed.status, claimed.worker_id, claimed.attempts) == (RunStatus.RUNNING.value, "w1", 1)
+    assert claimed.heartbeat_at is not None and claimed.started_at is not None
+
+    assert claim_next_run(db, "w2").id == second.id
+    assert claim_next_run(db, "w3") is None
+
+
+def test_skips_rows_locked_by_another_worker(db):
+    locked = _run(db)
+    free = _run(db)
+
+    other = SessionLocal()
+    try:
+        other.execute(select(Run).where(Run.id == locked.id).with_for_update()).scalar_one()
+        assert claim_next_run(db, "w1").id == free.id
+        assert claim_next_run(db, "w1") is None
+    finally:
+        other.rollback()
+        other.close()
+
+    assert claim_next_run(db, "w2").id == locked.id
+
+
+def test_reclaims_running_run_with_stale_heartbeat(db):
+    stale = _run(db, status=RunStatus.RUNNING, attempts=1, worker_id="dead",
+                 heartbeat_age=settings.WORKER_STALE_AFTER_SECONDS + 60)
+    _run(db, status=RunStatus.RUNNING, attempts=1, worker_id="alive", heartbeat_age=0)
+
+    claimed = claim_next_run(db, "w1")
+    assert claimed.id == stale.id
+    assert (claimed.worker_id, claimed.attempts) == ("w1", 2)
+    # the live run stays with its worker
+    assert claim_next_run(db, "w2") is None
+
+
+def test_fails_run_out_of_attempts_and_moves_on(db):
+    exhausted = _run(db, status=RunStatus.RUNNING, attempts=settings.WORKER_MAX_ATTEMPTS, worker_id="dead",
+                     heartbeat_age=settings.WORKER_STALE_AFTER_SECONDS + 60)
+    next_run = _run(db)
+
+    assert claim_next_run(db, "w1").id == next_run.id
+
+    db.refresh(exhausted)
+    assert exhausted.status == RunStatus.FAILED.value
+    assert exhausted.worker_id is None
+    assert exhausted.finished_at is not None
+
+
+def test_heartbeat_only_touches_own_running_runs(db):
+    mine = _run(db)
+    claim_next_run(db, "w1")
+    theirs = _run(db)
+    claim_next_run(db, "w2")
+
+    assert heartbeat_runs(db, [mine.id, theirs.id], "w1") == 1
+    assert heartbeat_runs(db, [], "w1") == 0
+
+
+def test_claim_batch_takes_the_claimable_rest_of_the_batch(db):
+    head = _run(db, batch_id="b")
+    rest = _run(db, batch_id="b")
+    _run(db, batch_id="other")
+    _run(db, batch_id="b", status=RunStatus.COMPLETED)
+    _run(db, batch_id="b", status=RunStatus.RUNNING, worker_id="alive", heartbeat_age=0)
+    spent = _run(db, batch_id="b", status=RunStatus.RUNNING, attempts=settings.WORKER_MAX_ATTEMPTS,
+                 worker_id="dead", heartbeat_age=settings.WORKER_STALE_AFTER_SECONDS + 60)
+
+    assert claim_next_run(db, "w1").id == head.id
+    claimed = claim_batch_runs(db, "b", "w1")
+    assert [r.id for r in claimed] == [rest.id]
+    assert claimed[0].worker_id == "w1" and claimed[0].attempts == 1
+
+    # out of attempts: left for claim_next_run to fail
+    db.refresh(spent)
+    assert spent.status == RunStatus.RUNNING.value
+    assert claim_batch_runs(db, "b", "w2") == []
@@ -0,0 +1,164 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from src.app.core.settings import settings
+from src.app.tools import openai_governor as governor
+from src.app.tools.openai_governor import BULK, INTERACTIVE, RPM_BUCKET, TPM_BUCKET
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(governor.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(governor.time, "sleep", clock.sleep)
+    # no jitter, so waits are exact
+    monkeypatch.setattr(governor.random, "uniform", lambda a, b: b)
+    return clock
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    # 60 requests and 6000 tokens per minute: 1 request and 100 tokens per second
+    monkeypatch.setattr(settings, "OPENAI_RPM", 60)
+    monkeypatch.setattr(settings, "OPENAI_TPM", 6000)
+    monkeypatch.setattr(settings, "OPENAI_BULK_RESERVE", 0.25)
+
+
+def _levels(buckets, clock):
+    return {name: round(buckets._level(name, clock.now), 6) for name in (RPM_BUCKET, TPM_BUCKET)}
+
+
+def test_buckets_start_full_and_debit(clock, limits):
+    buckets = governor._LocalBuckets()
+    assert _levels(buckets, clock) == {RPM_BUCKET: 60, TPM_BUCKET: 6000}
+
+    assert buckets.try_take({RPM_BUCKET: 1, TPM_BUCKET: 1000}, INTERACTIVE) == 0
+    assert _levels(buckets, clock) == {RPM_BUCKET: 59, TPM_BUCKET: 5000}
+
+
+@pytest.mark.parametrize(
+    "elapsed, expected_tpm",
+    [
+        (0, 0),
+        (1.5, 150),
+        (30, 3000),
+        # never above capacity
+        (600, 6000),
+    ],
+)
+def test_refill_is_linear_and_capped(clock, limits, elapsed, expected_tpm):
+    buckets = governor._LocalBuckets()
+    assert buckets.try_take({TPM_BUCKET: 6000}, INTERACTIVE) == 0
+    clock.now += elapsed
+    assert _levels(buckets, clock)[TPM_BUCKET] == expected_tpm
+
+
+def test_failed_take_debits_nothing_and_reports_the_wait(clock, limits):
+    buckets = governor._LocalBuckets()
+    assert buckets.try_take({RPM_BUCKET: 1, TPM_BUCKET: 5800}, INTERACTIVE) == 0
+
+    # 200 tokens left; 500 more needed at 100/s
+    assert buckets.try_take({RPM_BUCKET: 1, TPM_BUCKET: 700}, INTERACTIVE) == pytest.approx(5.0)
+    assert _levels(buckets, clock) == {RPM_BUCKET: 59, TPM_BUCKET: 200}
+
+
+def test_bulk_lane_leaves_the_reserve(clock, limits):
+    buckets = governor._LocalBuckets()
+    # bulk may only use 75% of the 6000 tokens
+    assert buckets.try_take({TPM_BUCKET: 4500}, BULK) == 0
+    assert buckets.try_take({TPM_BUCKET: 1}, BULK) == pytest.approx(0.01)
+    # interactive can still drain the reserve
+    assert buckets.try_take({TPM_BUCKET: 1500}, INTERACTIVE) == 0
+
+
+def test_adjust_refunds_and_charges(clock, limits):
+    buckets = governor._LocalBuckets()
+    buckets.try_take({TPM_BUCKET: 1000}, INTERACTIVE)
+    buckets.adjust(TPM_BUCKET, 400)
+    assert _levels(buckets, clock)[TPM_BUCKET] == 5400
+    buckets.adjust(TPM_BUCKET, -900)
+    assert _levels(buckets, clock)[TPM_BUCKET] == 4500
+
+
+def test_call_blocks_until_the_budget_refills(clock, limits):
+    buckets = governor._LocalBuckets()
+    assert governor._wait_for(buckets, 6000, INTERACTIVE) == 4500  # capped at the bulk-free share
+    assert clock.slept == []
+
+    start = clock.now
+    assert governor._wait_for(buckets, 1000, INTERACTIVE) == 1000
+    # 1500 tokens left, so 1000 fit at once; the next 1000 need 5 seconds of refill
+    assert clock.now == start
+    governor._wait_for(buckets, 1000, INTERACTIVE)
+    assert clock.now - start == pytest.approx(5.0)
+    assert all(s <= governor._MAX_WAIT_SECONDS for s in clock.slept)
+
+
+def test_settle_corrects_the_estimate_once():
+    adjusted = []
+    buckets = SimpleNamespace(adjust=lambda name, delta: adjusted.append((name, delta)))
+
+    admission = governor.Admission(buckets, charged_tokens=1000)
+    admission.settle(SimpleNamespace(total_tokens=700))
+    admission.settle(SimpleNamespace(total_tokens=100))
+    governor.Admission(buckets, charged_tokens=500).settle(SimpleNamespace(total_tokens=800))
+    governor.Admission(buckets, charged_tokens=500).settle(None)
+
+    assert adjusted == [(TPM_BUCKET, 300), (TPM_BUCKET, -300)]
+
+
+def test_lane_follows_context(monkeypatch):
+    seen = []
+
+    class _Recorder:
+        def try_take(self, costs, lane):
+            seen.append(lane)
+            return 0.0
+
+    monkeypatch.setattr(governor, "_get_buckets", lambda: _Recorder())
+
+    def call():
+        with governor.admit(10):
+            pass
+
+    call()
+    with governor.openai_lane(BULK):
+        call()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # a pool thread keeps the lane only with a copied context
+            pool.submit(contextvars.copy_context().run, call).result()
+            pool.submit(call).result()
+        with governor.admit(10, lane=INTERACTIVE):
+            seen.append("explicit")
+    call()
+
+    assert seen == [INTERACTIVE, BULK, BULK, INTERACTIVE, INTERACTIVE, "explicit", INTERACTIVE]
+
+
+def test_postgres_buckets_share_one_budget(db, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_RPM", 60)
+    monkeypatch.setattr(settings, "OPENAI_TPM", 6000)
+    monkeypatch.setattr(settings, "OPENAI_BULK_RESERVE", 0.25)
+
+    first, second = governor._PostgresBuckets(), governor._PostgresBuckets()
+    assert first.try_take({RPM_BUCKET: 1, TPM_BUCKET: 4000}, INTERACTIVE) == 0
+    # the second process sees the first one's debit
+    assert second.try_take({RPM_BUCKET: 1, TPM_BUCKET: 4000}, INTERACTIVE) == pytest.approx(20.0, abs=0.1)
+    second.adjust(TPM_BUCKET, 3000)
+    assert first.try_take({RPM_BUCKET: 1, TPM_BUCKET: 4000}, INTERACTIVE) == 0
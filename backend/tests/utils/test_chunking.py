@@ -0,0 +1,42 @@
+import pytest
+
+from src.app.utils.chunking import split_into_chunks
+
+
+def _words(n):
+    return " ".join(f"w{i:03d}" for i in range(n))
+
+
+@pytest.mark.parametrize(
+    "text, chunk_tokens, overlap_tokens, expected",
+    [
+        ("", 10, 2, []),
+        ("   \n ", 10, 2, []),
+        ("one  two\nthree", 10, 2, ["one two three"]),
+        # 5 chars per word, 30 chars per chunk: 6 words, 2 of them shared
+        (_words(10), 10, 4, [_words(6), " ".join(f"w{i:03d}" for i in range(4, 10))]),
+        # an oversized word gets a chunk of its own
+        ("x" * 50 + " tail", 5, 0, ["x" * 50, "tail"]),
+    ],
+)
+def test_split_into_chunks(text, chunk_tokens, overlap_tokens, expected):
+    assert split_into_chunks(text, chunk_tokens, overlap_tokens) == expected
+
+
+def test_chunks_cover_every_word_in_order():
+    text = _words(500)
+    chunks = split_into_chunks(text, 40, 8)
+    seen = []
+    for chunk in chunks:
+        for word in chunk.split():
+            if not seen or word > seen[-1]:
+                seen.append(word)
+    assert seen == text.split()
+    assert all(len(c) <= 40 * 3 for c in chunks)
+
+
+@pytest.mark.parametrize("overlap_tokens", [10, 1000])
+def test_overlap_is_capped_at_half_a_chunk(overlap_tokens):
+    # without the cap the window would advance one word at a time (995 chunks)
+    chunks = split_into_chunks(_words(1000), 10, overlap_tokens)
+    assert len(chunks) <= 1000 // 2
@@ -0,0 +1,50 @@
+import pytest
+
+from src.app.utils.minhash import MinHasher, estimated_jaccard, lsh_candidate_pairs, shingles
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", set()),
+        ("?!", set()),
+        ("ab", {"ab"}),
+        ("abcd", {"abcd"}),
+        ("abcde", {"abcd", "bcde"}),
+        # case and punctuation are ignored
+        ("A-B:c d", {"a b ", " b c", "b c ", " c d"}),
+    ],
+)
+def test_shingles(text, expected):
+    assert shingles(text) == expected
+
+
+def test_identical_sets_match_exactly():
+    hasher = MinHasher(num_perm=64)
+    items = shingles("Attention is all you need")
+    assert estimated_jaccard(hasher.signature(items), hasher.signature(set(items))) == 1.0
+
+
+def test_estimate_tracks_true_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a = {str(i) for i in range(100)}
+    b = {str(i) for i in range(50, 150)}  # true Jaccard 1/3
+    assert estimated_jaccard(hasher.signature(a), hasher.signature(b)) == pytest.approx(1 / 3, abs=0.1)
+
+
+def test_lsh_pairs_near_duplicates_only():
+    hasher = MinHasher(num_perm=64)
+    titles = [
+        "Attention Is All You Need",
+        "Attention is all you need.",
+        "Deep Residual Learning for Image Recognition",
+        "",
+        "",
+    ]
+    signatures = [hasher.signature(shingles(t)) for t in titles]
+    # empty titles never pair up, not even with each other
+    assert lsh_candidate_pairs(signatures, bands=16) == {(0, 1)}
+
+
+def test_lsh_no_signatures():
+    assert lsh_candidate_pairs([], bands=16) == set()
@@ -0,0 +1,58 @@
+import pytest
+
+from src.app.utils.partial_json import _close, parse_partial_json
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": "hel', '{"a": "hel"}'),
+        ('{"a": [1, 2', '{"a": [1, 2]}'),
+        ('{"a": {"b": 1', '{"a": {"b": 1}}'),
+        ('{"a": 1,', '{"a": 1}'),
+        # a dangling escape is dropped before the string is closed
+        ('{"a": "x\\', '{"a": "x"}'),
+        # brackets inside strings do not count
+        ('{"a": "[{', '{"a": "[{"}'),
+        ('{"a": 1}', '{"a": 1}'),
+    ],
+)
+def test_close(text, expected):
+    assert _close(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", None),
+        ("no json yet", None),
+        ("[1, 2]", None),
+        ("{", {}),
+        ('{"a', {}),
+        ('{"a":', {}),
+        ('{"a": "hel', {"a": "hel"}),
+        # half-written literals back off to the previous element
+        ('{"a": tr', {}),
+        ('{"a": 1.', {}),
+        ('{"a": 1, "b": tr', {"a": 1}),
+        ('{"a": 1, "b', {"a": 1}),
+        ('{"a": [1, 2', {"a": [1, 2]}),
+        ('{"a": [1, 2.', {"a": [1]}),
+        ('{"a": {"b": "x\\', {"a": {"b": "x"}}),
+        ('{"a": "x\\"q', {"a": 'x"q'}),
+        ('{"a": "x, y', {"a": "x, y"}),
+        ('{"a": ["p, q", "r', {"a": ["p, q", "r"]}),
+        ('preamble {"a": 1}', {"a": 1}),
+        ('{"a": 1, "b": [true, false]}', {"a": 1, "b": [True, False]}),
+    ],
+)
+def test_parse_partial_json(text, expected):
+    assert parse_partial_json(text) == expected
+
+
+def test_parse_partial_json_every_prefix():
+    full = '{"synthesis": "A, b", "gaps": ["g1", "g2"], "n": 12.5, "ok": true}'
+    for end in range(len(full) + 1):
+        partial = parse_partial_json(full[:end])
+        assert partial is None or isinstance(partial, dict)
+    assert parse_partial_json(full) == {"synthesis": "A, b", "gaps": ["g1", "g2"], "n": 12.5, "ok": True}